@@ -1,5 +1,4 @@
 import math
-from matplotlib import pyplot as plt
 
 class EllipticCurve:
     """Class to represent an elliptic curve.
@@ -175,6 +174,9 @@ class EllipticCurve:
         x_values = [x for x, y in self.__curve_points]
         y_values = [y for x, y in self.__curve_points]
 
+        # matplotlib takes hundreds of milliseconds to import and is only needed here
+        from matplotlib import pyplot as plt
+
         plt.title("Elliptic Curve")
         plt.xlabel("x")
         plt.ylabel("y")
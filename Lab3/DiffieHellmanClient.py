@@ -14,10 +14,7 @@ private_key = 3
 while generator_point == (math.inf, math.inf):
     generator_point = (5,1)
 
-public_key = generator_point
-
-for i in range(private_key - 1):
-    public_key = elliptic_curve.point_addition(public_key, generator_point)
+public_key = elliptic_curve.scalar_multiply(private_key, generator_point)
 
 data = {
     "generator_point": generator_point,
@@ -45,10 +42,7 @@ s.send(json_object.encode())
 # receive data from the server and decoding to get the string.
 sender_public_key = json.loads(s.recv(1024).decode())["public_key"]
 
-shared_key = sender_public_key
-
-for i in range(private_key - 1):
-    shared_key = elliptic_curve.point_addition(shared_key, sender_public_key)
+shared_key = elliptic_curve.scalar_multiply(private_key, sender_public_key)
 
 print("Shared key: ", shared_key)
 
@@ -46,10 +46,7 @@ while True:
     elliptic_curve = EllipticCurve(a, b, p)
     private_key = 4
 
-    public_key = generator_point
-
-    for i in range(private_key - 1):
-        public_key = elliptic_curve.point_addition(public_key, generator_point)
+    public_key = elliptic_curve.scalar_multiply(private_key, generator_point)
 
     data = {
         "public_key": public_key
@@ -61,10 +58,7 @@ while True:
     # send data to the client
     c.send(json_object.encode())
 
-    shared_key = sender_public_key
-
-    for i in range(private_key - 1):
-        shared_key = elliptic_curve.point_addition(shared_key, sender_public_key)
+    shared_key = elliptic_curve.scalar_multiply(private_key, sender_public_key)
 
     print("Shared key: ", shared_key)
 
@@ -1,6 +1,5 @@
 import math
 import random
-from matplotlib import pyplot as plt
 
 class EllipticCurve:
     """Class to represent an elliptic curve.
@@ -29,16 +28,9 @@ class EllipticCurve:
         self.__evaluation_results = []
         self.__quadratic_residues = set()
         self.__square_roots = {}
+        # the tables take O(prime) time and memory, they are computed on first access
         self.__curve_points = []
 
-        self.__calculate_values()
-
-    def __calculate_values(self):
-        self.get_evaluation_results()
-        self.get_quadratic_residues()
-        self.get_square_roots()
-        self.get_curve_points()
-
     def get_a(self) -> int:
         """Get the a value of the equation.
 
@@ -73,7 +65,7 @@ class EllipticCurve:
         self.__evaluation_results = []
         self.__quadratic_residues = set()
         self.__square_roots = {}
-        self.__calculate_values()
+        self.__curve_points = []
 
     def set_b(self, b: int) -> None:
         """Set the b value of the equation.
@@ -85,7 +77,7 @@ class EllipticCurve:
         self.__evaluation_results = []
         self.__quadratic_residues = set()
         self.__square_roots = {}
-        self.__calculate_values()
+        self.__curve_points = []
 
     def set_prime(self, prime: int) -> None:
         """Set the prime number.
@@ -97,7 +89,7 @@ class EllipticCurve:
         self.__evaluation_results = []
         self.__quadratic_residues = set()
         self.__square_roots = {}
-        self.__calculate_values()
+        self.__curve_points = []
 
     def get_evaluation_results(self) -> list:
         """Calculate and store the evaluation results for the equation.
@@ -140,19 +132,19 @@ class EllipticCurve:
         Returns:
             list: Contains the points on the curve.
         """
-        if not self.__evaluation_results:
-            self.get_evaluation_results()
-
         if not self.__curve_points:
+            evaluation_results = self.get_evaluation_results()
+            square_roots = self.get_square_roots()
+
             for i in range(0, self.__prime):
-                evaluated_value = self.__evaluation_results[i]
+                evaluated_value = evaluation_results[i]
 
                 if evaluated_value in self.get_quadratic_residues() or evaluated_value == 0:
                     if evaluated_value == 0:
                         self.__curve_points.append((i, 0))
                         continue
 
-                    for root in self.__square_roots[evaluated_value]:
+                    for root in square_roots[evaluated_value]:
                         self.__curve_points.append((i, root))
 
             # Add the point at infinity
@@ -191,6 +183,9 @@ class EllipticCurve:
         x_values = [x for x, y in self.__curve_points]
         y_values = [y for x, y in self.__curve_points]
 
+        # matplotlib takes hundreds of milliseconds to import and is only needed here
+        from matplotlib import pyplot as plt
+
         plt.title("Elliptic Curve")
         plt.xlabel("x")
         plt.ylabel("y")
@@ -198,6 +193,116 @@ class EllipticCurve:
         plt.show()
 
 
+    """
+    Point lookup without tables: Euler's criterion and Tonelli-Shanks answer each query in O(log p) multiplications.
+    """
+
+    def __evaluate(self, x: int) -> int:
+        """Evaluate the equation of the curve.
+
+        Args:
+            x (int): The x coordinate.
+
+        Returns:
+            int: x^3 + ax + b mod prime.
+        """
+        return (pow(x, 3, self.__prime) + self.__a * x + self.__b) % self.__prime
+
+    def is_quadratic_residue(self, value: int) -> bool:
+        """Check if a value has a square root modulo the prime (Euler's criterion).
+
+        Args:
+            value (int): The value to check.
+
+        Returns:
+            bool: True if the value is a quadratic residue or zero, False otherwise.
+        """
+        value %= self.__prime
+        return value == 0 or self.__prime == 2 or pow(value, (self.__prime - 1) // 2, self.__prime) == 1
+
+    def __square_root(self, value: int) -> int:
+        """Calculate a square root modulo the prime (Tonelli-Shanks, or one exponentiation if prime = 3 mod 4).
+
+        Args:
+            value (int): The value.
+
+        Returns:
+            int: A square root of the value, or None if it has none.
+        """
+        p = self.__prime
+        value %= p
+        if value == 0 or p == 2:
+            return value
+
+        if not self.is_quadratic_residue(value):
+            return None
+
+        if p % 4 == 3:
+            return pow(value, (p + 1) // 4, p)
+
+        # p - 1 = q * 2^s with q odd
+        q, s = p - 1, 0
+        while q % 2 == 0:
+            q //= 2
+            s += 1
+
+        # any quadratic non-residue
+        z = 2
+        while self.is_quadratic_residue(z):
+            z += 1
+
+        m, c, t, root = s, pow(z, q, p), pow(value, q, p), pow(value, (q + 1) // 2, p)
+        while t != 1:
+            # the least i with t^(2^i) = 1
+            i, t_power = 0, t
+            while t_power != 1:
+                t_power = t_power * t_power % p
+                i += 1
+
+            b = pow(c, 1 << (m - i - 1), p)
+            m, c, t, root = i, b * b % p, t * b * b % p, root * b % p
+
+        return root
+
+    def lift_x(self, x: int) -> list:
+        """Find the points of the curve with a given x coordinate (point decompression picks one by the parity of y).
+
+        Args:
+            x (int): The x coordinate.
+
+        Returns:
+            list: The points with that x coordinate, sorted by y (empty if there are none).
+        """
+        x %= self.__prime
+        y = self.__square_root(self.__evaluate(x))
+
+        if y is None:
+            return []
+
+        if y == 0:
+            return [(x, 0)]
+
+        return sorted([(x, y), (x, self.__prime - y)])
+
+    def is_on_curve(self, point: tuple) -> bool:
+        """Check if a point is on the curve.
+
+        Args:
+            point (tuple): The point to check.
+
+        Returns:
+            bool: True if the point is the point at infinity or satisfies the equation, False otherwise.
+        """
+        if point == (math.inf, math.inf):
+            return True
+
+        x, y = point
+        if not (isinstance(x, int) and isinstance(y, int) and 0 <= x < self.__prime and 0 <= y < self.__prime):
+            return False
+
+        return y * y % self.__prime == self.__evaluate(x)
+
+
     """
     Lab 2. Point addition and doubling in EC.
     """      
@@ -211,23 +316,24 @@ class EllipticCurve:
         Returns:
             int: The multiplicative inverse of x.
         """
-        u = x
+        u = x % self.__prime
         v = self.__prime
         x1 = 1
         x2 = 0
-        try:
-            while u != 1:
-                q = math.floor(v/u)
-                r = v - q * u
-                x = x2 - q * x1
-                v = u
-                u = r
-                x2 = x1
-                x1 = x
-        except:
+        if u == 0:
             return -1
 
-        return int(x1)
+        while u != 1:
+            # integer division: float division loses precision for large primes
+            q = v // u
+            r = v - q * u
+            x = x2 - q * x1
+            v = u
+            u = r
+            x2 = x1
+            x1 = x
+
+        return x1 % self.__prime
     
     def is_inverse_point(self, point1: tuple, point2: tuple) -> bool:
         """Check if two points are inverse.
@@ -267,14 +373,294 @@ class EllipticCurve:
             tuple: The resulting point.
         """
         
+        # the tangent is vertical at the point at infinity and at points of order 2
+        if point == (math.inf, math.inf) or point[1] % self.__prime == 0:
+            return (math.inf, math.inf)
+
         m = (3 * point[0]**2 + self.__a) * self.__get_modular_multiplicative_inverse(2 * point[1]) % self.__prime
         x = (m**2 - 2 * point[0]) % self.__prime
         y = (m * (point[0] - x) - point[1]) % self.__prime
 
         return (x, y)
-    
+
+    """
+    Jacobian coordinates: (X, Y, Z) stands for the affine point (X / Z^2, Y / Z^3) and Z = 0 for the point at infinity.
+    Chained operations stay in these coordinates and need no modular inverse; scalar_multiply converts back to affine once.
+    """
+
+    def __to_jacobian(self, point: tuple) -> tuple:
+        """Convert an affine point to Jacobian coordinates.
+
+        Args:
+            point (tuple): The affine point.
+
+        Returns:
+            tuple: The point in Jacobian coordinates.
+        """
+        if point == (math.inf, math.inf):
+            return (1, 1, 0)
+
+        return (point[0] % self.__prime, point[1] % self.__prime, 1)
+
+    def __to_affine(self, point: tuple) -> tuple:
+        """Convert a point in Jacobian coordinates to affine coordinates (one modular inverse).
+
+        Args:
+            point (tuple): The point in Jacobian coordinates.
+
+        Returns:
+            tuple: The affine point.
+        """
+        x, y, z = point
+        if z == 0:
+            return (math.inf, math.inf)
+
+        z_inverse = self.__get_modular_multiplicative_inverse(z)
+        z_inverse_squared = z_inverse * z_inverse % self.__prime
+
+        return (x * z_inverse_squared % self.__prime, y * z_inverse_squared * z_inverse % self.__prime)
+
+    def __jacobian_negation(self, point: tuple) -> tuple:
+        """Negate a point in Jacobian coordinates.
+
+        Args:
+            point (tuple): The point in Jacobian coordinates.
+
+        Returns:
+            tuple: The inverse point in Jacobian coordinates.
+        """
+        return (point[0], -point[1] % self.__prime, point[2])
+
+    def __jacobian_doubling(self, point: tuple) -> tuple:
+        """Double a point in Jacobian coordinates.
+
+        Args:
+            point (tuple): The point in Jacobian coordinates.
+
+        Returns:
+            tuple: The resulting point in Jacobian coordinates.
+        """
+        x, y, z = point
+        if z == 0 or y == 0:
+            return (1, 1, 0)
+
+        p = self.__prime
+        yy = y * y % p
+        zz = z * z % p
+        s = 4 * x * yy % p
+        m = (3 * x * x + self.__a * zz * zz) % p
+        x3 = (m * m - 2 * s) % p
+        y3 = (m * (s - x3) - 8 * yy * yy) % p
+        z3 = 2 * y * z % p
+
+        return (x3, y3, z3)
+
+    def __jacobian_addition(self, point1: tuple, point2: tuple) -> tuple:
+        """Add two points in Jacobian coordinates.
+
+        Args:
+            point1 (tuple): The first point in Jacobian coordinates.
+            point2 (tuple): The second point in Jacobian coordinates.
+
+        Returns:
+            tuple: The resulting point in Jacobian coordinates.
+        """
+        x1, y1, z1 = point1
+        x2, y2, z2 = point2
+        if z1 == 0:
+            return point2
+        if z2 == 0:
+            return point1
+
+        p = self.__prime
+        z1z1 = z1 * z1 % p
+        z2z2 = z2 * z2 % p
+        u1 = x1 * z2z2 % p
+        u2 = x2 * z1z1 % p
+        s1 = y1 * z2 * z2z2 % p
+        s2 = y2 * z1 * z1z1 % p
+
+        if u1 == u2:
+            # same x: either the same point or inverse points
+            return self.__jacobian_doubling(point1) if s1 == s2 else (1, 1, 0)
+
+        h = (u2 - u1) % p
+        r = (s2 - s1) % p
+        hh = h * h % p
+        hhh = h * hh % p
+        v = u1 * hh % p
+        x3 = (r * r - hhh - 2 * v) % p
+        y3 = (r * (v - x3) - s1 * hhh) % p
+        z3 = z1 * z2 * h % p
+
+        return (x3, y3, z3)
+
+    def point_negation(self, point: tuple) -> tuple:
+        """Negate a point on the curve.
+
+        Args:
+            point (tuple): The point to negate.
+
+        Returns:
+            tuple: The inverse point.
+        """
+        if point == (math.inf, math.inf):
+            return point
+
+        return (point[0], -point[1] % self.__prime)
+
+    def scalar_multiply(self, k: int, point: tuple, method: str = "wnaf", window: int = 4) -> tuple:
+        """Multiply a point by a scalar using O(log k) point additions and doublings.
+
+        Args:
+            k (int): The scalar.
+            point (tuple): The point to multiply.
+            method (str): "double_and_add", "wnaf" or "sliding_window".
+            window (int): The window width of the "wnaf" and "sliding_window" methods (at least 2).
+
+        Returns:
+            tuple: The point k * point.
+        """
+        if window < 2:
+            raise ValueError("The window width must be at least 2")
+
+        if k < 0:
+            return self.scalar_multiply(-k, self.point_negation(point), method, window)
+
+        if method == "double_and_add":
+            result = self.__double_and_add(k, self.__to_jacobian(point))
+        elif method == "wnaf":
+            result = self.__wnaf_multiply(k, self.__to_jacobian(point), window)
+        elif method == "sliding_window":
+            result = self.__sliding_window_multiply(k, self.__to_jacobian(point), window)
+        else:
+            raise ValueError(f"Unknown scalar multiplication method: {method}")
+
+        return self.__to_affine(result)
+
+    def __double_and_add(self, k: int, point: tuple) -> tuple:
+        """Multiply a point by a non-negative scalar, one bit at a time (most significant first).
+
+        Args:
+            k (int): The scalar.
+            point (tuple): The point to multiply, in Jacobian coordinates.
+
+        Returns:
+            tuple: The point k * point, in Jacobian coordinates.
+        """
+        result = (1, 1, 0)
+
+        for bit in bin(k)[2:]:
+            result = self.__jacobian_doubling(result)
+            if bit == "1":
+                result = self.__jacobian_addition(result, point)
+
+        return result
+
+    def __odd_multiples(self, point: tuple, count: int) -> list:
+        """Calculate the odd multiples point, 3 * point, 5 * point, ...
+
+        Args:
+            point (tuple): The point, in Jacobian coordinates.
+            count (int): The number of multiples.
+
+        Returns:
+            list: The odd multiples in Jacobian coordinates, (2i + 1) * point at position i.
+        """
+        doubled = self.__jacobian_doubling(point)
+        multiples = [point]
+
+        for _ in range(count - 1):
+            multiples.append(self.__jacobian_addition(multiples[-1], doubled))
+
+        return multiples
+
+    @staticmethod
+    def __wnaf(k: int, window: int) -> list:
+        """Calculate the width-w non-adjacent form of a scalar.
+
+        Every non-zero digit is odd, smaller than 2^(w-1) in absolute value and followed by at least w-1 zeros.
+
+        Args:
+            k (int): The non-negative scalar.
+            window (int): The width w.
+
+        Returns:
+            list: The digits, least significant first.
+        """
+        digits = []
+
+        while k > 0:
+            digit = 0
+            if k & 1:
+                digit = k % (1 << window)
+                if digit >= 1 << (window - 1):
+                    digit -= 1 << window
+                k -= digit
+            digits.append(digit)
+            k >>= 1
+
+        return digits
+
+    def __wnaf_multiply(self, k: int, point: tuple, window: int) -> tuple:
+        """Multiply a point by a non-negative scalar using its wNAF (about n / (w + 1) additions for n bits).
+
+        Args:
+            k (int): The scalar.
+            point (tuple): The point to multiply, in Jacobian coordinates.
+            window (int): The width of the wNAF.
+
+        Returns:
+            tuple: The point k * point, in Jacobian coordinates.
+        """
+        multiples = self.__odd_multiples(point, 1 << (window - 2))
+        result = (1, 1, 0)
+
+        for digit in reversed(self.__wnaf(k, window)):
+            result = self.__jacobian_doubling(result)
+            if digit > 0:
+                result = self.__jacobian_addition(result, multiples[digit // 2])
+            elif digit < 0:
+                result = self.__jacobian_addition(result, self.__jacobian_negation(multiples[-digit // 2]))
+
+        return result
+
+    def __sliding_window_multiply(self, k: int, point: tuple, window: int) -> tuple:
+        """Multiply a point by a non-negative scalar, adding one odd multiple per window of bits.
+
+        Args:
+            k (int): The scalar.
+            point (tuple): The point to multiply, in Jacobian coordinates.
+            window (int): The maximum number of bits per window.
+
+        Returns:
+            tuple: The point k * point, in Jacobian coordinates.
+        """
+        multiples = self.__odd_multiples(point, 1 << (window - 1))
+        bits = bin(k)[2:]
+        result = (1, 1, 0)
+        i = 0
+
+        while i < len(bits):
+            if bits[i] == "0":
+                result = self.__jacobian_doubling(result)
+                i += 1
+                continue
+
+            # the longest window of at most `window` bits that ends with a one
+            j = min(i + window, len(bits))
+            while bits[j - 1] == "0":
+                j -= 1
+
+            for _ in range(j - i):
+                result = self.__jacobian_doubling(result)
+            result = self.__jacobian_addition(result, multiples[int(bits[i:j], 2) // 2])
+            i = j
+
+        return result
+
     def __is_prime(self, n : int):
-        """Check if a number is prime or not.
+        """Check if a number is prime or not (Miller-Rabin with the first 12 prime bases, deterministic below 3.3 * 10^24).
 
         Args:
             n (int): The number to check if it is prime or not.
@@ -282,30 +668,176 @@ class EllipticCurve:
         Returns:
             bool: True if the number is prime, False otherwise.
         """
+        bases = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
         if n < 2:
             return False
-        for i in range(2, int(n ** 0.5) + 1):
-            if n % i == 0:
+        for base in bases:
+            if n % base == 0:
+                return n == base
+
+        # n - 1 = d * 2^s with d odd
+        d, s = n - 1, 0
+        while d % 2 == 0:
+            d //= 2
+            s += 1
+
+        for base in bases:
+            x = pow(base, d, n)
+            if x == 1 or x == n - 1:
+                continue
+            for _ in range(s - 1):
+                x = x * x % n
+                if x == n - 1:
+                    break
+            else:
                 return False
         return True
-    
+
+    def __find_divisor(self, n: int) -> int:
+        """Find a non-trivial divisor of an odd composite number with Pollard's rho.
+
+        Args:
+            n (int): The composite number.
+
+        Returns:
+            int: A divisor d of n with 1 < d < n.
+        """
+        c = 1
+        while True:
+            x = y = 2
+            d = 1
+            while d == 1:
+                x = (x * x + c) % n
+                y = (y * y + c) % n
+                y = (y * y + c) % n
+                d = math.gcd(abs(x - y), n)
+            if d != n:
+                return d
+            c += 1
+
+    def __factorize(self, n: int) -> dict:
+        """Factorize a positive integer by trial division by small primes and Pollard's rho.
+
+        Args:
+            n (int): The number to factorize.
+
+        Returns:
+            dict: The prime factors of n and their exponents.
+        """
+        if n < 1:
+            raise ValueError("Only positive integers can be factorized")
+
+        factors = {}
+        for q in range(2, 1000):
+            while n % q == 0:
+                factors[q] = factors.get(q, 0) + 1
+                n //= q
+
+        pending = [n] if n > 1 else []
+        while pending:
+            m = pending.pop()
+            if self.__is_prime(m):
+                factors[m] = factors.get(m, 0) + 1
+            else:
+                d = self.__find_divisor(m)
+                pending += [d, m // d]
+
+        return factors
+
+    def __multiple_of_order(self, point: tuple) -> int:
+        """Find a multiple of the order of a point with baby-step giant-step over the Hasse interval.
+
+        By Hasse's theorem the group order lies in [p + 1 - 2 sqrt(p), p + 1 + 2 sqrt(p)], so it takes
+        O(p^(1/4)) point additions to find an m in that interval with m * point = O.
+
+        Args:
+            point (tuple): The point.
+
+        Returns:
+            int: A positive m with m * point = O.
+        """
+        infinity = (math.inf, math.inf)
+        width = 2 * math.isqrt(4 * self.__prime) + 2
+        lower = max(1, self.__prime + 1 - width // 2)
+        steps = math.isqrt(width) + 1
+
+        # baby steps: j * point for 0 <= j < steps
+        baby_steps = {}
+        resulting_point = infinity
+        for j in range(steps):
+            baby_steps.setdefault(resulting_point, j)
+            resulting_point = self.point_addition(resulting_point, point)
+
+        # giant steps: -(lower + i * steps) * point, a match gives (lower + i * steps + j) * point = O
+        giant_step = self.point_negation(self.scalar_multiply(steps, point))
+        resulting_point = self.point_negation(self.scalar_multiply(lower, point))
+        for i in range(width // steps + 2):
+            if resulting_point in baby_steps:
+                return lower + i * steps + baby_steps[resulting_point]
+            resulting_point = self.point_addition(resulting_point, giant_step)
+
+        raise ValueError("The point is not on the curve")
+
+    def point_order(self, point: tuple, group_order: int = None) -> int:
+        """Compute the order of a point without enumerating the group.
+
+        Starting from a multiple n of the order, every prime q | n is divided out while (n / q) * point = O.
+        Without the group order, the multiple is found with baby-step giant-step.
+
+        Args:
+            point (tuple): The point.
+            group_order (int): The number of points of the curve, if known.
+
+        Returns:
+            int: The least k > 0 with k * point = O.
+        """
+        if not self.is_on_curve(point):
+            raise ValueError("The point is not on the curve")
+
+        if group_order is not None and group_order < 1:
+            raise ValueError("The group order must be a positive integer")
+
+        infinity = (math.inf, math.inf)
+        order = group_order if group_order is not None else self.__multiple_of_order(point)
+        if self.scalar_multiply(order, point) != infinity:
+            raise ValueError("The order of the point does not divide the group order")
+
+        for q, exponent in self.__factorize(order).items():
+            for _ in range(exponent):
+                if self.scalar_multiply(order // q, point) != infinity:
+                    break
+                order //= q
+
+        return order
+
+    def is_generator(self, point: tuple, group_order: int = None) -> bool:
+        """Check if a point generates the group of points of the curve, i.e. (n / q) * point != O for every prime q | n.
+
+        Args:
+            point (tuple): The point.
+            group_order (int): The number of points of the curve n. If it is not given the points are enumerated,
+                so it should be given for big curves.
+
+        Returns:
+            bool: True if the order of the point is the group order, False otherwise.
+        """
+        if group_order is None:
+            group_order = len(self.get_curve_points())
+        elif group_order < 1:
+            raise ValueError("The group order must be a positive integer")
+
+        infinity = (math.inf, math.inf)
+        if not self.is_on_curve(point) or self.scalar_multiply(group_order, point) != infinity:
+            return False
+
+        return all(self.scalar_multiply(group_order // q, point) != infinity for q in self.__factorize(group_order))
+
     def is_a_generator_point(self, point: tuple) -> bool:
         """Check if a point is a generator point.
         Returns:
             bool: True if the point is a generator point, False otherwise.
         """
-        
-        if self.__is_prime(len(self.__curve_points)):
-            return True
-        
-        resulting_point = point
-
-        for i in range(len(self.__curve_points)):
-            resulting_point = self.point_addition(resulting_point, point)
-            if not resulting_point in self.__curve_points:
-                return False
-            
-        return True
+        return self.is_generator(point)
 
         
 if __name__ == '__main__':
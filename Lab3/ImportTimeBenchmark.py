@@ -0,0 +1,95 @@
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ENTRY_POINTS = ["DiffieHellmanClient.py", "DiffieHellmanServer.py"]
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def entry_point_imports(filename: str) -> str:
+    """Get the import statements of an entry point.
+
+    The client and the server open sockets at module level, so only their imports are run.
+
+    Args:
+        filename (str): The name of the entry point.
+
+    Returns:
+        str: The import statements, one per line.
+    """
+    with open(os.path.join(DIRECTORY, filename)) as file:
+        tree = ast.parse(file.read())
+
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure_imports(code: str) -> tuple:
+    """Run import statements in a fresh interpreter with -X importtime.
+
+    Args:
+        code (str): The import statements.
+
+    Returns:
+        tuple: The wall-clock time of the interpreter in milliseconds, the cumulative import time
+            in milliseconds and a dict with the cumulative time of each top-level import.
+    """
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=DIRECTORY, capture_output=True, text=True, check=True)
+    wall_clock = (time.perf_counter() - start) * 1000
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        if not package.startswith("  "):
+            imports[package.strip()] = int(cumulative) / 1000
+
+    return wall_clock, sum(imports.values()), imports
+
+
+def benchmark_entry_point(filename: str, runs: int) -> dict:
+    """Measure the cold-start import cost of an entry point.
+
+    Args:
+        filename (str): The name of the entry point.
+        runs (int): The number of interpreters to start (the median is reported).
+
+    Returns:
+        dict: The median wall-clock and import times in milliseconds and the slowest imports of the last run.
+    """
+    code = entry_point_imports(filename)
+    measurements = [measure_imports(code) for _ in range(runs)]
+
+    return {
+        "wall_clock": statistics.median(wall_clock for wall_clock, _, _ in measurements),
+        "imports": statistics.median(total for _, total, _ in measurements),
+        "slowest": sorted(measurements[-1][2].items(), key=lambda item: item[1], reverse=True)[:5],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the import time of the Diffie-Hellman client and server.")
+    parser.add_argument("--runs", type=int, default=5, help="interpreters started per entry point")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the imports of an entry point take longer")
+    args = parser.parse_args()
+
+    failed = False
+    for entry_point in ENTRY_POINTS:
+        result = benchmark_entry_point(entry_point, args.runs)
+        print(f"{entry_point}: imports {result['imports']:.1f} ms, interpreter start {result['wall_clock']:.1f} ms")
+
+        for package, milliseconds in result["slowest"]:
+            print(f"\t{package}: {milliseconds:.1f} ms")
+
+        if args.max_ms is not None and result["imports"] > args.max_ms:
+            print(f"{entry_point}: imports take longer than {args.max_ms} ms")
+            failed = True
+
+    sys.exit(1 if failed else 0)
@@ -5,9 +5,19 @@ Implementation of Ascon v1.2, an authenticated cipher and hash function
 http://ascon.iaik.tugraz.at/
 """
 
+from array import array
+from functools import lru_cache
+import hmac
+import importlib.util
+import os
+import sys
+
 debug = False
 debugpermutation = False
 
+MAC_STATE_CACHE_SIZE = 256 # (variant, key) pairs whose initialized Mac/Prf state is kept
+WORD_CHUNK_SIZE = 2048 * 40 # bytes converted to/from 64-bit words at once (a multiple of every block size)
+
 # === Ascon hash/xof ===
 
 def ascon_hash(message, variant="Ascon-Hash", hashlength=32): 
@@ -17,42 +27,126 @@ def ascon_hash(message, variant="Ascon-Hash", hashlength=32):
     variant: "Ascon-Hash", "Ascon-Hasha" (both with 256-bit output for 128-bit security), "Ascon-Xof", or "Ascon-Xofa" (both with arbitrary output length, security=min(128, bitlen/2))
     hashlength: the requested output bytelength (must be 32 for variant "Ascon-Hash"; can be arbitrary for Ascon-Xof, but should be >= 32 for 128-bit security)
     returns a bytes object containing the hash tag
+    runs on the selected backend (see set_backend)
     """
-    assert variant in ["Ascon-Hash", "Ascon-Hasha", "Ascon-Xof", "Ascon-Xofa"]
-    if variant in ["Ascon-Hash", "Ascon-Hasha"]: assert(hashlength == 32)
-    a = 12   # rounds
-    b = 8 if variant in ["Ascon-Hasha", "Ascon-Xofa"] else 12
-    rate = 8 # bytes
+    return BACKEND["hash"](message, variant, hashlength)
 
-    # Initialization
-    tagspec = int_to_bytes(256 if variant in ["Ascon-Hash", "Ascon-Hasha"] else 0, 4)
-    S = bytes_to_state(to_bytes([0, rate * 8, a, a-b]) + tagspec + zero_bytes(32))
-    if debug: printstate(S, "initial value:")
 
-    ascon_permutation(S, a)
-    if debug: printstate(S, "initialization:")
+def ascon_hash_python(message, variant="Ascon-Hash", hashlength=32):
+    """
+    Ascon hash function and extendable-output function in pure Python - internal helper function.
+    message, variant, hashlength: as for ascon_hash
+    returns a bytes object containing the hash tag
+    """
+    return AsconHash(variant, message).digest(hashlength)
 
-    # Message Processing (Absorbing)
-    m_padding = to_bytes([0x80]) + zero_bytes(rate - (len(message) % rate) - 1)
-    m_padded = message + m_padding
 
-    # first s-1 blocks
-    for block in range(0, len(m_padded) - rate, rate):
-        S[0] ^= bytes_to_int(m_padded[block:block+8])  # rate=8
-        ascon_permutation(S, b)
-    # last block
-    block = len(m_padded) - rate
-    S[0] ^= bytes_to_int(m_padded[block:block+8])  # rate=8
-    if debug: printstate(S, "process message:")
+class AsconHash:
+    """
+    Incremental Ascon hash and extendable-output function with a hashlib-style interface.
+    variant: "Ascon-Hash", "Ascon-Hasha", "Ascon-Xof", or "Ascon-Xofa" (as for ascon_hash)
+    data: optional first chunk of the message
+    update() absorbs the message in chunks of any size (only a partial block is buffered),
+    digest()/hexdigest() return the hash of everything absorbed so far without consuming the object,
+    copy() forks the state (e.g. to hash several messages sharing a prefix), and for the Xof variants
+    read(n) squeezes the next n output bytes and can be called repeatedly.
+    """
 
-    # Finalization (Squeezing)
-    H = b""
-    ascon_permutation(S, a)
-    while len(H) < hashlength:
-        H += int_to_bytes(S[0], 8)  # rate=8
-        ascon_permutation(S, b)
-    if debug: printstate(S, "finalization:")
-    return H[:hashlength]
+    block_size = 8 # bytes (rate)
+
+    def __init__(self, variant="Ascon-Hash", data=b""):
+        assert variant in ["Ascon-Hash", "Ascon-Hasha", "Ascon-Xof", "Ascon-Xofa"]
+        self.name = variant
+        self.digest_size = 32
+        self.a = 12   # rounds
+        self.b = 8 if variant in ["Ascon-Hasha", "Ascon-Xofa"] else 12
+        self.buffer = b""
+        self.output = None # bytes squeezed but not yet returned by read(), None while absorbing
+
+        self.S = list(ascon_hash_initial_state(variant))
+        self.update(data)
+
+    def update(self, data):
+        """
+        data: a bytes-like object of arbitrary length
+        returns nothing, absorbs all complete blocks
+        """
+        assert self.output is None, "cannot update after read()"
+        head, body, self.buffer = ascon_split_stream(self.buffer, data, self.block_size)
+        ascon_hash_absorb(self.S, self.b, head)
+        ascon_hash_absorb(self.S, self.b, body)
+
+    def copy(self):
+        """
+        returns an independent copy of the hash object
+        """
+        other = AsconHash.__new__(AsconHash)
+        other.__dict__.update(self.__dict__)
+        other.S = list(self.S)
+        return other
+
+    def digest(self, length=32):
+        """
+        length: the requested output bytelength (must be 32 for Ascon-Hash, Ascon-Hasha)
+        returns a bytes object containing the hash of the data absorbed so far
+        """
+        assert self.output is None, "use read() to continue squeezing"
+        if self.name in ["Ascon-Hash", "Ascon-Hasha"]: assert(length == 32)
+        return self.copy().read_output(length)
+
+    def hexdigest(self, length=32):
+        """
+        returns the digest as a string of hexadecimal digits
+        """
+        return bytes_to_hex(self.digest(length))
+
+    def read(self, n):
+        """
+        n: the number of output bytes to squeeze (Ascon-Xof, Ascon-Xofa only)
+        returns the next n bytes of the output stream; no more data can be absorbed afterwards
+        """
+        assert self.name in ["Ascon-Xof", "Ascon-Xofa"]
+        return self.read_output(n)
+
+    def read_output(self, n):
+        """
+        Squeezing - internal helper function.
+        returns the next n bytes of the output stream, finalizing the absorption on the first call
+        """
+        if self.output is None:
+            # last block (padded)
+            last = self.buffer + to_bytes([0x80]) + zero_bytes(self.block_size - len(self.buffer) - 1)
+            self.S[0] ^= bytes_to_words(last)[0]
+            self.buffer = b""
+            if debug: printstate(self.S, "process message:")
+
+            ascon_permutation(self.S, self.a)
+            self.output = b""
+
+        H = bytearray(self.output[:n])
+        self.output = self.output[n:]
+        while len(H) < n:
+            block = words_to_bytes([self.S[0]])  # rate=8
+            ascon_permutation(self.S, self.b)
+            take = min(8, n - len(H))
+            H += block[:take]
+            self.output = block[take:]
+        if debug: printstate(self.S, "finalization:")
+        return bytes(H)
+
+
+def ascon_hash_absorb(S, b, message):
+    """
+    Ascon hash/xof absorption of complete 8-byte blocks (no padding) - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    message: a bytes-like object whose length is a multiple of 8
+    returns nothing, updates S
+    """
+    for chunk in range(0, len(message), WORD_CHUNK_SIZE):
+        for word in bytes_to_words(message[chunk:chunk+WORD_CHUNK_SIZE]):
+            S[0] ^= word  # rate=8
+            ascon_permutation(S, b)
 
 
 # === Ascon MAC/PRF ===
@@ -65,6 +159,16 @@ def ascon_mac(key, message, variant="Ascon-Mac", taglength=16):
     variant: "Ascon-Mac", "Ascon-Maca" (both 128-bit output, arbitrarily long input), "Ascon-Prf", "Ascon-Prfa" (both arbitrarily long input and output), or "Ascon-PrfShort" (t-bit output for t<=128, m-bit input for m<=128)
     taglength: the requested output bytelength l/8 (must be <=16 for variants "Ascon-Mac", "Ascon-Maca", and "Ascon-PrfShort", arbitrary for "Ascon-Prf", "Ascon-Prfa"; should be >= 16 for 128-bit security)
     returns a bytes object containing the authentication tag
+    runs on the selected backend (see set_backend)
+    """
+    return BACKEND["mac"](key, message, variant, taglength)
+
+
+def ascon_mac_python(key, message, variant="Ascon-Mac", taglength=16):
+    """
+    Ascon MAC and PRF in pure Python - internal helper function.
+    key, message, variant, taglength: as for ascon_mac
+    returns a bytes object containing the authentication tag
     """
     assert variant in ["Ascon-Mac", "Ascon-Prf", "Ascon-Maca", "Ascon-Prfa", "Ascon-PrfShort"]
     if variant in ["Ascon-Mac", "Ascon-Maca"]: assert(len(key) == 16 and taglength <= 16)
@@ -85,52 +189,183 @@ def ascon_mac(key, message, variant="Ascon-Mac", taglength=16):
         if debug: printstate(S, "process message:")
 
         # Finalization (Squeezing)
-        T = int_to_bytes(S[3] ^ bytes_to_int(key[0:8]), 8) + int_to_bytes(S[4] ^ bytes_to_int(key[8:16]), 8)
+        K = bytes_to_words(key)
+        T = words_to_bytes([S[3] ^ K[0], S[4] ^ K[1]])
         return T[:taglength]
 
     else: # Ascon-Prf, Ascon-Prfa, Ascon-Mac, Ascon-Maca
-        # Initialization
-        if variant in ["Ascon-Mac", "Ascon-Maca"]: tagspec = int_to_bytes(16*8, 4)
-        if variant in ["Ascon-Prf", "Ascon-Prfa"]: tagspec = int_to_bytes(0*8, 4)
-        S = bytes_to_state(to_bytes([len(key) * 8, rate * 8, a + 128, a-b]) + tagspec + key + zero_bytes(16))
-        if debug: printstate(S, "initial value:")
+        # Initialization (cached per variant and key)
+        initial_state = ascon_mac_initial_state.__wrapped__ if debug else ascon_mac_initial_state
+        S = list(initial_state(variant, bytes(key)))
 
-        ascon_permutation(S, a)
-        if debug: printstate(S, "initialization:")
-
-        # Message Processing (Absorbing)
-        m_padding = to_bytes([0x80]) + zero_bytes(msgblocksize - (len(message) % msgblocksize) - 1)
-        m_padded = message + m_padding
-
-        # first s-1 blocks
-        for block in range(0, len(m_padded) - msgblocksize, msgblocksize):
-            S[0] ^= bytes_to_int(m_padded[block:block+8])     # msgblocksize=32 bytes
-            S[1] ^= bytes_to_int(m_padded[block+8:block+16])
-            S[2] ^= bytes_to_int(m_padded[block+16:block+24])
-            S[3] ^= bytes_to_int(m_padded[block+24:block+32])
-            if variant in ["Ascon-Prfa", "Ascon-Maca"]:
-                S[4] ^= bytes_to_int(m_padded[block+32:block+40])
+        return ascon_mac_process(S, a, b, msgblocksize, message, taglength)
+
+
+class AsconMac:
+    """
+    Ascon-Mac/Prf context for authenticating many messages with the same key.
+    key: a bytes object of size 16
+    variant: "Ascon-Mac", "Ascon-Maca", "Ascon-Prf", or "Ascon-Prfa" (use ascon_mac for "Ascon-PrfShort")
+    taglength: the requested output bytelength (restrictions as for ascon_mac)
+    The keyed initial state and the block parameters are set up once, so mac() and verify() only
+    process the message, without any variant checks. verify() compares tags in constant time.
+    """
+
+    def __init__(self, key, variant="Ascon-Mac", taglength=16):
+        assert variant in ["Ascon-Mac", "Ascon-Prf", "Ascon-Maca", "Ascon-Prfa"]
+        assert(len(key) == 16)
+        if variant in ["Ascon-Mac", "Ascon-Maca"]: assert(taglength <= 16)
+        self.variant = variant
+        self.taglength = taglength
+        self.a = 12  # rounds
+        self.b = 8 if variant in ["Ascon-Prfa", "Ascon-Maca"] else 12  # rounds
+        self.msgblocksize = 40 if variant in ["Ascon-Prfa", "Ascon-Maca"] else 32 # bytes
+        self.initial_state = ascon_mac_initial_state.__wrapped__(variant, bytes(key))
+
+    def mac(self, message):
+        """
+        message: a bytes-like object of arbitrary length
+        returns a bytes object containing the authentication tag
+        """
+        return ascon_mac_process(list(self.initial_state), self.a, self.b, self.msgblocksize, message, self.taglength)
+
+    def verify(self, message, tag):
+        """
+        message: a bytes-like object of arbitrary length
+        tag: the received tag
+        returns True if tag is the tag of message (compared in constant time), False otherwise
+        """
+        return hmac.compare_digest(self.mac(message), bytes(tag))
+
+
+def ascon_mac_process(S, a, b, msgblocksize, message, taglength):
+    """
+    Ascon-Mac/Prf message processing and finalization phase - internal helper function.
+    S: Ascon state after initialization, a list of 5 64-bit integers
+    a: number of initialization/finalization rounds for permutation
+    b: number of intermediate rounds for permutation
+    msgblocksize: input block size in bytes (32 for Ascon-Mac, Ascon-Prf; 40 for Ascon-Maca, Ascon-Prfa)
+    message: a bytes-like object of arbitrary length (read in place, only the last block is padded)
+    taglength: the requested output bytelength
+    returns a bytes object containing the authentication tag, updates S
+    """
+    message = memoryview(message)
+    m_lastlen = len(message) % msgblocksize
+    m_full = len(message) - m_lastlen
+
+    # Message Processing (Absorbing)
+    # first s-1 blocks
+    MAC_ABSORB[msgblocksize](S, b, message[:m_full])
+    # last block
+    m_last = to_bytes(message[m_full:]) + to_bytes([0x80]) + zero_bytes(msgblocksize - m_lastlen - 1)
+    for w, word in enumerate(bytes_to_words(m_last)):
+        S[w] ^= word
+    S[4] ^= 1
+    if debug: printstate(S, "process message:")
+
+    # Finalization (Squeezing)
+    T = array('Q')
+    ascon_permutation(S, a)
+    while len(T) * 8 < taglength:
+        T.append(S[0])  # rate=16
+        T.append(S[1])
+        ascon_permutation(S, b)
+    if debug: printstate(S, "finalization:")
+    return words_to_bytes(T)[:taglength]
+
+
+def ascon_mac_absorb_32(S, b, message):
+    """
+    Ascon-Mac/Prf absorption of complete 32-byte blocks (no padding) - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    message: a bytes-like object whose length is a multiple of 32
+    returns nothing, updates S
+    """
+    for chunk in range(0, len(message), WORD_CHUNK_SIZE):
+        words = bytes_to_words(message[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(0, len(words), 4):
+            S[0] ^= words[block]
+            S[1] ^= words[block+1]
+            S[2] ^= words[block+2]
+            S[3] ^= words[block+3]
             ascon_permutation(S, b)
-        # last block
-        block = len(m_padded) - msgblocksize
-        S[0] ^= bytes_to_int(m_padded[block:block+8])     # msgblocksize=32 bytes
-        S[1] ^= bytes_to_int(m_padded[block+8:block+16])
-        S[2] ^= bytes_to_int(m_padded[block+16:block+24])
-        S[3] ^= bytes_to_int(m_padded[block+24:block+32])
-        if variant in ["Ascon-Prfa", "Ascon-Maca"]:
-            S[4] ^= bytes_to_int(m_padded[block+32:block+40])
-        S[4] ^= 1
-        if debug: printstate(S, "process message:")
 
-        # Finalization (Squeezing)
-        T = b""
-        ascon_permutation(S, a)
-        while len(T) < taglength:
-            T += int_to_bytes(S[0], 8)  # rate=16
-            T += int_to_bytes(S[1], 8)
+
+def ascon_mac_absorb_40(S, b, message):
+    """
+    Ascon-Maca/Prfa absorption of complete 40-byte blocks (no padding) - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    message: a bytes-like object whose length is a multiple of 40
+    returns nothing, updates S
+    """
+    for chunk in range(0, len(message), WORD_CHUNK_SIZE):
+        words = bytes_to_words(message[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(0, len(words), 5):
+            S[0] ^= words[block]
+            S[1] ^= words[block+1]
+            S[2] ^= words[block+2]
+            S[3] ^= words[block+3]
+            S[4] ^= words[block+4]
             ascon_permutation(S, b)
-        if debug: printstate(S, "finalization:")
-        return T[:taglength]
+
+
+# absorb loops per input block size, selected once per message instead of checking the variant in every block
+MAC_ABSORB = {32: ascon_mac_absorb_32, 40: ascon_mac_absorb_40}
+
+
+# === Ascon initial state caches ===
+
+HASH_INITIAL_STATES = {} # variant -> state after initialization
+
+def ascon_hash_initial_state(variant):
+    """
+    Ascon hash/xof initialization phase - internal helper function.
+    The state only depends on the variant, so it is computed once and kept in HASH_INITIAL_STATES
+    (bypassed while debug is set, so the trace is printed).
+    variant: "Ascon-Hash", "Ascon-Hasha", "Ascon-Xof", or "Ascon-Xofa"
+    returns the state after initialization as a tuple of 5 64-bit integers
+    """
+    if variant in HASH_INITIAL_STATES and not debug:
+        return HASH_INITIAL_STATES[variant]
+    a = 12   # rounds
+    b = 8 if variant in ["Ascon-Hasha", "Ascon-Xofa"] else 12
+    rate = 8 # bytes
+
+    tagspec = int_to_bytes(256 if variant in ["Ascon-Hash", "Ascon-Hasha"] else 0, 4)
+    S = bytes_to_state(to_bytes([0, rate * 8, a, a-b]) + tagspec + zero_bytes(32))
+    if debug: printstate(S, "initial value:")
+
+    ascon_permutation(S, a)
+    if debug: printstate(S, "initialization:")
+
+    HASH_INITIAL_STATES[variant] = tuple(S)
+    return HASH_INITIAL_STATES[variant]
+
+
+@lru_cache(maxsize=MAC_STATE_CACHE_SIZE)
+def ascon_mac_initial_state(variant, key):
+    """
+    Ascon Mac/Prf initialization phase - internal helper function.
+    The state only depends on the variant and the key, so the most recently used ones are kept in
+    a bounded LRU cache (MAC_STATE_CACHE_SIZE entries; call ascon_mac_initial_state.cache_clear()
+    to drop the cached key material).
+    variant: "Ascon-Mac", "Ascon-Maca", "Ascon-Prf", or "Ascon-Prfa"
+    key: a bytes object of size 16
+    returns the state after initialization as a tuple of 5 64-bit integers
+    """
+    a = 12  # rounds
+    b = 8 if variant in ["Ascon-Prfa", "Ascon-Maca"] else 12  # rounds
+    rate = 16 # bytes (output rate)
+
+    tagspec = int_to_bytes(16*8 if variant in ["Ascon-Mac", "Ascon-Maca"] else 0, 4)
+    S = bytes_to_state(to_bytes([len(key) * 8, rate * 8, a + 128, a-b]) + tagspec + key + zero_bytes(16))
+    if debug: printstate(S, "initial value:")
+
+    ascon_permutation(S, a)
+    if debug: printstate(S, "initialization:")
+    return tuple(S)
 
 
 # === Ascon AEAD encryption and decryption ===
@@ -144,6 +379,16 @@ def ascon_encrypt(key, nonce, associateddata, plaintext, variant="Ascon-128"):
     plaintext: a bytes object of arbitrary length
     variant: "Ascon-128", "Ascon-128a", or "Ascon-80pq" (specifies key size, rate and number of rounds)
     returns a bytes object of length len(plaintext)+16 containing the ciphertext and tag
+    runs on the selected backend (see set_backend)
+    """
+    return BACKEND["encrypt"](key, nonce, associateddata, plaintext, variant)
+
+
+def ascon_encrypt_python(key, nonce, associateddata, plaintext, variant="Ascon-128"):
+    """
+    Ascon encryption in pure Python - internal helper function.
+    key, nonce, associateddata, plaintext, variant: as for ascon_encrypt
+    returns a bytes object of length len(plaintext)+16 containing the ciphertext and tag
     """
     assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
     if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16)
@@ -156,9 +401,10 @@ def ascon_encrypt(key, nonce, associateddata, plaintext, variant="Ascon-128"):
 
     ascon_initialize(S, k, rate, a, b, key, nonce)
     ascon_process_associated_data(S, b, rate, associateddata)
-    ciphertext = ascon_process_plaintext(S, b, rate, plaintext)
-    tag = ascon_finalize(S, rate, a, key)
-    return ciphertext + tag
+    output = bytearray(len(plaintext) + 16)   # ciphertext followed by the tag, copied out once
+    ascon_process_plaintext_into(S, b, rate, plaintext, memoryview(output)[:-16])
+    output[-16:] = ascon_finalize(S, rate, a, key)
+    return bytes(output)
 
 
 def ascon_decrypt(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
@@ -170,6 +416,16 @@ def ascon_decrypt(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
     ciphertext: a bytes object of arbitrary length (also contains tag)
     variant: "Ascon-128", "Ascon-128a", or "Ascon-80pq" (specifies key size, rate and number of rounds)
     returns a bytes object containing the plaintext or None if verification fails
+    runs on the selected backend (see set_backend)
+    """
+    return BACKEND["decrypt"](key, nonce, associateddata, ciphertext, variant)
+
+
+def ascon_decrypt_python(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
+    """
+    Ascon decryption in pure Python - internal helper function.
+    key, nonce, associateddata, ciphertext, variant: as for ascon_decrypt
+    returns a bytes object containing the plaintext or None if verification fails
     """
     assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
     if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16 and len(ciphertext) >= 16)
@@ -184,12 +440,211 @@ def ascon_decrypt(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
     ascon_process_associated_data(S, b, rate, associateddata)
     plaintext = ascon_process_ciphertext(S, b, rate, ciphertext[:-16])
     tag = ascon_finalize(S, rate, a, key)
-    if tag == ciphertext[-16:]:
+    if hmac.compare_digest(tag, bytes(ciphertext[-16:])):
         return plaintext
     else:
         return None
 
 
+def ascon_encrypt_into(key, nonce, associateddata, plaintext, ciphertext, variant="Ascon-128"):
+    """
+    Ascon encryption writing the ciphertext into a caller-provided buffer (e.g. a memory-mapped file).
+    key, nonce, associateddata, variant: as for ascon_encrypt
+    plaintext: a bytes-like object of arbitrary length (e.g. a memoryview of a memory-mapped file)
+    ciphertext: a writable bytes-like object of size len(plaintext), receives the ciphertext without tag
+    returns the 16-byte tag
+    """
+    assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+    if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16)
+    if variant == "Ascon-80pq": assert(len(key) == 20 and len(nonce) == 16)
+    S = [0, 0, 0, 0, 0]
+    k = len(key) * 8   # bits
+    a = 12   # rounds
+    b = 8 if variant == "Ascon-128a" else 6   # rounds
+    rate = 16 if variant == "Ascon-128a" else 8   # bytes
+
+    ascon_initialize(S, k, rate, a, b, key, nonce)
+    ascon_process_associated_data(S, b, rate, associateddata)
+    ascon_process_plaintext_into(S, b, rate, plaintext, ciphertext)
+    return ascon_finalize(S, rate, a, key)
+
+
+def ascon_decrypt_into(key, nonce, associateddata, ciphertext, tag, plaintext, variant="Ascon-128"):
+    """
+    Ascon decryption writing the plaintext into a caller-provided buffer (e.g. a memory-mapped file).
+    key, nonce, associateddata, variant: as for ascon_decrypt
+    ciphertext: a bytes-like object of arbitrary length without tag (e.g. a memoryview of a memory-mapped file)
+    tag: a bytes object of size 16
+    plaintext: a writable bytes-like object of size len(ciphertext), receives the plaintext
+    returns True if verification succeeds; otherwise returns False and overwrites plaintext with zeros
+    """
+    assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+    if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16 and len(tag) == 16)
+    if variant == "Ascon-80pq": assert(len(key) == 20 and len(nonce) == 16 and len(tag) == 16)
+    S = [0, 0, 0, 0, 0]
+    k = len(key) * 8 # bits
+    a = 12 # rounds
+    b = 8 if variant == "Ascon-128a" else 6   # rounds
+    rate = 16 if variant == "Ascon-128a" else 8   # bytes
+
+    ascon_initialize(S, k, rate, a, b, key, nonce)
+    ascon_process_associated_data(S, b, rate, associateddata)
+    ascon_process_ciphertext_into(S, b, rate, ciphertext, plaintext)
+    if hmac.compare_digest(ascon_finalize(S, rate, a, key), bytes(tag)):
+        return True
+    else:
+        memoryview(plaintext)[:] = zero_bytes(len(ciphertext))
+        return False
+
+
+def ascon_verify(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
+    """
+    Ascon tag verification without decryption (no plaintext is produced).
+    key, nonce, associateddata, ciphertext, variant: as for ascon_decrypt
+    returns True if the tag at the end of ciphertext is valid (compared in constant time), otherwise False
+    """
+    assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+    if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16)
+    if variant == "Ascon-80pq": assert(len(key) == 20 and len(nonce) == 16)
+    if len(ciphertext) < 16: return False
+    S = [0, 0, 0, 0, 0]
+    k = len(key) * 8 # bits
+    a = 12 # rounds
+    b = 8 if variant == "Ascon-128a" else 6   # rounds
+    rate = 16 if variant == "Ascon-128a" else 8   # bytes
+
+    ascon_initialize(S, k, rate, a, b, key, nonce)
+    ascon_process_associated_data(S, b, rate, associateddata)
+    ascon_absorb_ciphertext(S, b, rate, memoryview(ciphertext)[:-16])
+    tag = ascon_finalize(S, rate, a, key)
+    return hmac.compare_digest(tag, bytes(ciphertext[-16:]))
+
+
+def ascon_decrypt_verified(key, nonce, associateddata, ciphertext, variant="Ascon-128", length=None):
+    """
+    Two-pass Ascon decryption (verify-then-decrypt): the plaintext is only computed once the tag is valid,
+    so rejecting a forged ciphertext costs one pass and no plaintext; accepting one costs two passes.
+    key, nonce, associateddata, ciphertext, variant: as for ascon_decrypt
+    length: the expected plaintext length if the protocol fixes it (other ciphertexts are rejected without any computation)
+    returns a bytes object containing the plaintext or None if verification fails
+    """
+    if len(ciphertext) < 16 or (length is not None and len(ciphertext) != length + 16):
+        return None
+    if not ascon_verify(key, nonce, associateddata, ciphertext, variant):
+        return None
+    return ascon_decrypt(key, nonce, associateddata, ciphertext, variant)
+
+
+# === Ascon AEAD streaming interface ===
+
+class AsconEncryptor:
+    """
+    Incremental Ascon encryption.
+    key, nonce, associateddata, variant: as for ascon_encrypt
+    Feed the plaintext in chunks of any size with update(); every call returns the ciphertext
+    produced so far. finalize() returns the remaining ciphertext followed by the 16-byte tag,
+    so the concatenation of all outputs equals ascon_encrypt(key, nonce, associateddata, plaintext, variant).
+    At most one partial block is buffered between calls.
+    """
+
+    def __init__(self, key, nonce, associateddata=b"", variant="Ascon-128"):
+        assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+        if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16)
+        if variant == "Ascon-80pq": assert(len(key) == 20 and len(nonce) == 16)
+        self.key = key
+        self.variant = variant
+        self.a = 12   # rounds
+        self.b = 8 if variant == "Ascon-128a" else 6   # rounds
+        self.rate = 16 if variant == "Ascon-128a" else 8   # bytes
+        self.S = [0, 0, 0, 0, 0]
+        self.buffer = b""
+        self.finalized = False
+
+        ascon_initialize(self.S, len(key) * 8, self.rate, self.a, self.b, key, nonce)
+        ascon_process_associated_data(self.S, self.b, self.rate, associateddata)
+
+    def update(self, plaintext):
+        """
+        plaintext: a bytes-like object of arbitrary length
+        returns the ciphertext for all complete blocks received so far
+        """
+        assert not self.finalized
+        head, body, self.buffer = ascon_split_stream(self.buffer, plaintext, self.rate)
+        ciphertext = bytearray(len(head) + len(body))
+        ascon_process_plaintext_blocks(self.S, self.b, self.rate, head, memoryview(ciphertext)[:len(head)])
+        ascon_process_plaintext_blocks(self.S, self.b, self.rate, body, memoryview(ciphertext)[len(head):])
+        return bytes(ciphertext)
+
+    def finalize(self):
+        """
+        returns the ciphertext of the last (partial) block followed by the 16-byte tag
+        """
+        assert not self.finalized
+        self.finalized = True
+        ciphertext = ascon_process_plaintext(self.S, self.b, self.rate, self.buffer)
+        tag = ascon_finalize(self.S, self.rate, self.a, self.key)
+        self.buffer = b""
+        return ciphertext + tag
+
+
+class AsconDecryptor:
+    """
+    Incremental Ascon decryption.
+    key, nonce, associateddata, variant: as for ascon_decrypt
+    Feed the ciphertext (followed by its 16-byte tag) in chunks of any size with update(); every call
+    returns the plaintext produced so far. The last 16 bytes received are held back as the tag and
+    checked by finalize(), which returns the remaining plaintext or None if verification fails.
+    Plaintext returned by update() is unauthenticated until finalize() succeeds and must be discarded otherwise.
+    """
+
+    def __init__(self, key, nonce, associateddata=b"", variant="Ascon-128"):
+        assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+        if variant in ["Ascon-128", "Ascon-128a"]: assert(len(key) == 16 and len(nonce) == 16)
+        if variant == "Ascon-80pq": assert(len(key) == 20 and len(nonce) == 16)
+        self.key = key
+        self.variant = variant
+        self.a = 12   # rounds
+        self.b = 8 if variant == "Ascon-128a" else 6   # rounds
+        self.rate = 16 if variant == "Ascon-128a" else 8   # bytes
+        self.S = [0, 0, 0, 0, 0]
+        self.buffer = b""
+        self.finalized = False
+
+        ascon_initialize(self.S, len(key) * 8, self.rate, self.a, self.b, key, nonce)
+        ascon_process_associated_data(self.S, self.b, self.rate, associateddata)
+
+    def update(self, ciphertext):
+        """
+        ciphertext: a bytes-like object of arbitrary length
+        returns the (unauthenticated) plaintext for all complete blocks that cannot be part of the tag
+        """
+        assert not self.finalized
+        head, body, self.buffer = ascon_split_stream(self.buffer, ciphertext, self.rate, 16)
+        plaintext = bytearray(len(head) + len(body))
+        ascon_process_ciphertext_blocks(self.S, self.b, self.rate, head, memoryview(plaintext)[:len(head)])
+        ascon_process_ciphertext_blocks(self.S, self.b, self.rate, body, memoryview(plaintext)[len(head):])
+        return bytes(plaintext)
+
+    def finalize(self):
+        """
+        returns the plaintext of the last (partial) block or None if verification fails
+        """
+        assert not self.finalized
+        self.finalized = True
+        if len(self.buffer) < 16:
+            # truncated stream, shorter than the tag
+            self.buffer = b""
+            return None
+        plaintext = ascon_process_ciphertext(self.S, self.b, self.rate, self.buffer[:-16])
+        tag = ascon_finalize(self.S, self.rate, self.a, self.key)
+        received_tag = self.buffer[-16:]
+        self.buffer = b""
+        if hmac.compare_digest(tag, received_tag):
+            return plaintext
+        else:
+            return None
+
+
 # === Ascon AEAD building blocks ===
 
 def ascon_initialize(S, k, rate, a, b, key, nonce):
@@ -225,20 +680,22 @@ def ascon_process_associated_data(S, b, rate, associateddata):
     S: Ascon state, a list of 5 64-bit integers
     b: number of intermediate rounds for permutation
     rate: block size in bytes (8 for Ascon-128, 16 for Ascon-128a)
-    associateddata: a bytes object of arbitrary length
+    associateddata: a bytes-like object of arbitrary length (read in place, only the last block is padded)
     returns nothing, updates S
     """
     if len(associateddata) > 0:
-        a_zeros = rate - (len(associateddata) % rate) - 1
-        a_padding = to_bytes([0x80] + [0 for i in range(a_zeros)])
-        a_padded = associateddata + a_padding
+        associateddata = memoryview(associateddata)
+        a_lastlen = len(associateddata) % rate
+        a_full = len(associateddata) - a_lastlen
 
-        for block in range(0, len(a_padded), rate):
-            S[0] ^= bytes_to_int(a_padded[block:block+8])
-            if rate == 16:
-                S[1] ^= bytes_to_int(a_padded[block+8:block+16])
+        ASSOCIATED_DATA_BLOCKS[rate](S, b, associateddata[:a_full])
 
-            ascon_permutation(S, b)
+        # last block (padded)
+        a_last = to_bytes(associateddata[a_full:]) + to_bytes([0x80]) + zero_bytes(rate - a_lastlen - 1)
+        for w, word in enumerate(bytes_to_words(a_last)):
+            S[w] ^= word
+
+        ascon_permutation(S, b)
 
     S[4] ^= 1
     if debug: printstate(S, "process associated data:")
@@ -250,37 +707,39 @@ def ascon_process_plaintext(S, b, rate, plaintext):
     S: Ascon state, a list of 5 64-bit integers
     b: number of intermediate rounds for permutation
     rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
-    plaintext: a bytes object of arbitrary length
+    plaintext: a bytes-like object of arbitrary length (read in place, only the last block is padded)
     returns the ciphertext (without tag), updates S
     """
+    ciphertext = bytearray(len(plaintext))
+    ascon_process_plaintext_into(S, b, rate, plaintext, ciphertext)
+    return bytes(ciphertext)
+
+
+def ascon_process_plaintext_into(S, b, rate, plaintext, ciphertext):
+    """
+    Ascon plaintext processing phase writing into a caller-provided buffer - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
+    plaintext: a bytes-like object of arbitrary length (read in place, only the last block is padded)
+    ciphertext: a writable bytes-like object (bytearray, memoryview, mmap) of the same length
+    returns nothing, updates S and writes the ciphertext (without tag) into ciphertext
+    """
+    plaintext = memoryview(plaintext)
+    ciphertext = memoryview(ciphertext)
+    assert(len(ciphertext) == len(plaintext))
     p_lastlen = len(plaintext) % rate
-    p_padding = to_bytes([0x80] + (rate-p_lastlen-1)*[0x00])
-    p_padded = plaintext + p_padding
+    p_full = len(plaintext) - p_lastlen
 
     # first t-1 blocks
-    ciphertext = to_bytes([])
-    for block in range(0, len(p_padded) - rate, rate):
-        if rate == 8:
-            S[0] ^= bytes_to_int(p_padded[block:block+8])
-            ciphertext += int_to_bytes(S[0], 8)
-        elif rate == 16:
-            S[0] ^= bytes_to_int(p_padded[block:block+8])
-            S[1] ^= bytes_to_int(p_padded[block+8:block+16])
-            ciphertext += (int_to_bytes(S[0], 8) + int_to_bytes(S[1], 8))
-
-        ascon_permutation(S, b)
+    ascon_process_plaintext_blocks(S, b, rate, plaintext[:p_full], ciphertext[:p_full])
 
     # last block t
-    block = len(p_padded) - rate
-    if rate == 8:
-        S[0] ^= bytes_to_int(p_padded[block:block+8])
-        ciphertext += int_to_bytes(S[0], 8)[:p_lastlen]
-    elif rate == 16:
-        S[0] ^= bytes_to_int(p_padded[block:block+8])
-        S[1] ^= bytes_to_int(p_padded[block+8:block+16])
-        ciphertext += (int_to_bytes(S[0], 8)[:min(8,p_lastlen)] + int_to_bytes(S[1], 8)[:max(0,p_lastlen-8)])
+    p_last = to_bytes(plaintext[p_full:]) + to_bytes([0x80]) + zero_bytes(rate - p_lastlen - 1)
+    for w, word in enumerate(bytes_to_words(p_last)):
+        S[w] ^= word
+    ciphertext[p_full:] = words_to_bytes(S[:rate//8])[:p_lastlen]
     if debug: printstate(S, "process plaintext:")
-    return ciphertext
 
 
 def ascon_process_ciphertext(S, b, rate, ciphertext):
@@ -289,48 +748,239 @@ def ascon_process_ciphertext(S, b, rate, ciphertext):
     S: Ascon state, a list of 5 64-bit integers
     b: number of intermediate rounds for permutation
     rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
-    ciphertext: a bytes object of arbitrary length
+    ciphertext: a bytes-like object of arbitrary length (read in place, only the last block is padded)
     returns the plaintext, updates S
     """
+    plaintext = bytearray(len(ciphertext))
+    ascon_process_ciphertext_into(S, b, rate, ciphertext, plaintext)
+    return bytes(plaintext)
+
+
+def ascon_process_ciphertext_into(S, b, rate, ciphertext, plaintext):
+    """
+    Ascon ciphertext processing phase writing into a caller-provided buffer - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
+    ciphertext: a bytes-like object of arbitrary length (read in place, only the last block is padded)
+    plaintext: a writable bytes-like object (bytearray, memoryview, mmap) of the same length
+    returns nothing, updates S and writes the plaintext into plaintext
+    """
+    ciphertext = memoryview(ciphertext)
+    plaintext = memoryview(plaintext)
+    assert(len(plaintext) == len(ciphertext))
     c_lastlen = len(ciphertext) % rate
-    c_padded = ciphertext + zero_bytes(rate - c_lastlen)
+    c_full = len(ciphertext) - c_lastlen
 
     # first t-1 blocks
-    plaintext = to_bytes([])
-    for block in range(0, len(c_padded) - rate, rate):
-        if rate == 8:
-            Ci = bytes_to_int(c_padded[block:block+8])
-            plaintext += int_to_bytes(S[0] ^ Ci, 8)
-            S[0] = Ci
-        elif rate == 16:
-            Ci = (bytes_to_int(c_padded[block:block+8]), bytes_to_int(c_padded[block+8:block+16]))
-            plaintext += (int_to_bytes(S[0] ^ Ci[0], 8) + int_to_bytes(S[1] ^ Ci[1], 8))
-            S[0] = Ci[0]
-            S[1] = Ci[1]
-
-        ascon_permutation(S, b)
+    ascon_process_ciphertext_blocks(S, b, rate, ciphertext[:c_full], plaintext[:c_full])
 
     # last block t
-    block = len(c_padded) - rate
+    c_last = to_bytes(ciphertext[c_full:]) + zero_bytes(rate - c_lastlen)
     if rate == 8:
         c_padding1 = (0x80 << (rate-c_lastlen-1)*8)
         c_mask = (0xFFFFFFFFFFFFFFFF >> (c_lastlen*8))
-        Ci = bytes_to_int(c_padded[block:block+8])
-        plaintext += int_to_bytes(Ci ^ S[0], 8)[:c_lastlen]
+        Ci = bytes_to_words(c_last)[0]
+        plaintext[c_full:] = words_to_bytes([Ci ^ S[0]])[:c_lastlen]
         S[0] = Ci ^ (S[0] & c_mask) ^ c_padding1
     elif rate == 16:
         c_lastlen_word = c_lastlen % 8
         c_padding1 = (0x80 << (8-c_lastlen_word-1)*8)
         c_mask = (0xFFFFFFFFFFFFFFFF >> (c_lastlen_word*8))
-        Ci = (bytes_to_int(c_padded[block:block+8]), bytes_to_int(c_padded[block+8:block+16]))
-        plaintext += (int_to_bytes(S[0] ^ Ci[0], 8) + int_to_bytes(S[1] ^ Ci[1], 8))[:c_lastlen]
+        Ci = bytes_to_words(c_last)
+        plaintext[c_full:] = words_to_bytes([S[0] ^ Ci[0], S[1] ^ Ci[1]])[:c_lastlen]
         if c_lastlen < 8:
             S[0] = Ci[0] ^ (S[0] & c_mask) ^ c_padding1
         else:
             S[0] = Ci[0]
             S[1] = Ci[1] ^ (S[1] & c_mask) ^ c_padding1
     if debug: printstate(S, "process ciphertext:")
-    return plaintext
+
+
+def ascon_absorb_ciphertext(S, b, rate, ciphertext):
+    """
+    Ascon ciphertext processing without producing plaintext (for tag verification) - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
+    ciphertext: a bytes-like object of arbitrary length without tag
+    returns nothing, updates S exactly as ascon_process_ciphertext does
+    """
+    c_lastlen = len(ciphertext) % rate
+    c_full = len(ciphertext) - c_lastlen
+
+    # first t-1 blocks: the state takes the ciphertext words
+    CIPHERTEXT_ABSORB[rate](S, b, ciphertext[:c_full])
+
+    # last block t
+    c_last = to_bytes(ciphertext[c_full:]) + zero_bytes(rate - c_lastlen)
+    Ci = bytes_to_words(c_last)
+    w = c_lastlen // 8 # the word holding the padding
+    c_padding1 = (0x80 << (8-c_lastlen%8-1)*8)
+    c_mask = (0xFFFFFFFFFFFFFFFF >> ((c_lastlen%8)*8))
+    for i in range(w):
+        S[i] = Ci[i]
+    S[w] = Ci[w] ^ (S[w] & c_mask) ^ c_padding1
+    if debug: printstate(S, "process ciphertext:")
+
+
+def ascon_process_plaintext_blocks(S, b, rate, plaintext, ciphertext):
+    """
+    Ascon plaintext processing of complete blocks (no padding) - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
+    plaintext: a bytes-like object whose length is a multiple of rate
+    ciphertext: a writable bytes-like object (bytearray or memoryview) of the same length
+    returns nothing, updates S and writes the ciphertext into ciphertext
+    """
+    assert(len(plaintext) % rate == 0 and len(ciphertext) == len(plaintext))
+    PLAINTEXT_BLOCKS[rate](S, b, plaintext, ciphertext)
+
+
+def ascon_process_plaintext_blocks_8(S, b, plaintext, ciphertext):
+    """
+    ascon_process_plaintext_blocks specialized for rate 8 (Ascon-128, Ascon-80pq) - internal helper function.
+    """
+    for chunk in range(0, len(plaintext), WORD_CHUNK_SIZE):
+        words = bytes_to_words(plaintext[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(len(words)):
+            S[0] ^= words[block]
+            words[block] = S[0]
+            ascon_permutation(S, b)
+        ciphertext[chunk:chunk+8*len(words)] = words_to_bytes(words)
+
+
+def ascon_process_plaintext_blocks_16(S, b, plaintext, ciphertext):
+    """
+    ascon_process_plaintext_blocks specialized for rate 16 (Ascon-128a) - internal helper function.
+    """
+    for chunk in range(0, len(plaintext), WORD_CHUNK_SIZE):
+        words = bytes_to_words(plaintext[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(0, len(words), 2):
+            S[0] ^= words[block]
+            S[1] ^= words[block+1]
+            words[block] = S[0]
+            words[block+1] = S[1]
+            ascon_permutation(S, b)
+        ciphertext[chunk:chunk+8*len(words)] = words_to_bytes(words)
+
+
+def ascon_process_ciphertext_blocks(S, b, rate, ciphertext, plaintext):
+    """
+    Ascon ciphertext processing of complete blocks (no padding) - internal helper function.
+    S: Ascon state, a list of 5 64-bit integers
+    b: number of intermediate rounds for permutation
+    rate: block size in bytes (8 for Ascon-128, Ascon-80pq; 16 for Ascon-128a)
+    ciphertext: a bytes-like object whose length is a multiple of rate
+    plaintext: a writable bytes-like object (bytearray or memoryview) of the same length
+    returns nothing, updates S and writes the plaintext into plaintext
+    """
+    assert(len(ciphertext) % rate == 0 and len(plaintext) == len(ciphertext))
+    CIPHERTEXT_BLOCKS[rate](S, b, ciphertext, plaintext)
+
+
+def ascon_process_ciphertext_blocks_8(S, b, ciphertext, plaintext):
+    """
+    ascon_process_ciphertext_blocks specialized for rate 8 (Ascon-128, Ascon-80pq) - internal helper function.
+    """
+    for chunk in range(0, len(ciphertext), WORD_CHUNK_SIZE):
+        words = bytes_to_words(ciphertext[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(len(words)):
+            Ci = words[block]
+            words[block] = S[0] ^ Ci
+            S[0] = Ci
+            ascon_permutation(S, b)
+        plaintext[chunk:chunk+8*len(words)] = words_to_bytes(words)
+
+
+def ascon_process_ciphertext_blocks_16(S, b, ciphertext, plaintext):
+    """
+    ascon_process_ciphertext_blocks specialized for rate 16 (Ascon-128a) - internal helper function.
+    """
+    for chunk in range(0, len(ciphertext), WORD_CHUNK_SIZE):
+        words = bytes_to_words(ciphertext[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(0, len(words), 2):
+            C0 = words[block]
+            C1 = words[block+1]
+            words[block] = S[0] ^ C0
+            words[block+1] = S[1] ^ C1
+            S[0] = C0
+            S[1] = C1
+            ascon_permutation(S, b)
+        plaintext[chunk:chunk+8*len(words)] = words_to_bytes(words)
+
+
+def ascon_absorb_ciphertext_blocks_8(S, b, ciphertext):
+    """
+    ascon_absorb_ciphertext of complete 8-byte blocks (Ascon-128, Ascon-80pq) - internal helper function.
+    """
+    for chunk in range(0, len(ciphertext), WORD_CHUNK_SIZE):
+        for word in bytes_to_words(ciphertext[chunk:chunk+WORD_CHUNK_SIZE]):
+            S[0] = word
+            ascon_permutation(S, b)
+
+
+def ascon_absorb_ciphertext_blocks_16(S, b, ciphertext):
+    """
+    ascon_absorb_ciphertext of complete 16-byte blocks (Ascon-128a) - internal helper function.
+    """
+    for chunk in range(0, len(ciphertext), WORD_CHUNK_SIZE):
+        words = bytes_to_words(ciphertext[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(0, len(words), 2):
+            S[0] = words[block]
+            S[1] = words[block+1]
+            ascon_permutation(S, b)
+
+
+def ascon_process_associated_data_blocks_8(S, b, associateddata):
+    """
+    Ascon associated data absorption of complete 8-byte blocks (Ascon-128, Ascon-80pq) - internal helper function.
+    """
+    for chunk in range(0, len(associateddata), WORD_CHUNK_SIZE):
+        for word in bytes_to_words(associateddata[chunk:chunk+WORD_CHUNK_SIZE]):
+            S[0] ^= word
+            ascon_permutation(S, b)
+
+
+def ascon_process_associated_data_blocks_16(S, b, associateddata):
+    """
+    Ascon associated data absorption of complete 16-byte blocks (Ascon-128a) - internal helper function.
+    """
+    for chunk in range(0, len(associateddata), WORD_CHUNK_SIZE):
+        words = bytes_to_words(associateddata[chunk:chunk+WORD_CHUNK_SIZE])
+        for block in range(0, len(words), 2):
+            S[0] ^= words[block]
+            S[1] ^= words[block+1]
+            ascon_permutation(S, b)
+
+
+# block loops per rate, selected once per call instead of checking the rate in every block
+PLAINTEXT_BLOCKS = {8: ascon_process_plaintext_blocks_8, 16: ascon_process_plaintext_blocks_16}
+CIPHERTEXT_BLOCKS = {8: ascon_process_ciphertext_blocks_8, 16: ascon_process_ciphertext_blocks_16}
+CIPHERTEXT_ABSORB = {8: ascon_absorb_ciphertext_blocks_8, 16: ascon_absorb_ciphertext_blocks_16}
+ASSOCIATED_DATA_BLOCKS = {8: ascon_process_associated_data_blocks_8, 16: ascon_process_associated_data_blocks_16}
+
+
+def ascon_split_stream(buffer, data, rate, holdback=0):
+    """
+    Split buffered bytes plus a new chunk into whole blocks for streaming - internal helper function.
+    buffer: a bytes object with the bytes left over from previous calls
+    data: a bytes-like object with the new chunk
+    rate: block size in bytes
+    holdback: number of trailing bytes that must stay buffered (16 for the tag during decryption)
+    returns (head, body, buffer): head is a bytes object with the buffered bytes topped up to whole blocks,
+    body is a memoryview into data with the remaining whole blocks, buffer holds the bytes to keep
+    """
+    data = memoryview(data)
+    full = max(0, len(buffer) + len(data) - holdback)
+    full -= full % rate
+    if full <= len(buffer):
+        # everything that can be processed is already buffered
+        return buffer[:full], data[:0], buffer[full:] + to_bytes(data)
+    used = (-len(buffer)) % rate
+    body_end = full - len(buffer)
+    return buffer + to_bytes(data[:used]), data[used:body_end], to_bytes(data[body_end:])
 
 
 def ascon_finalize(S, rate, a, key):
@@ -343,21 +993,25 @@ def ascon_finalize(S, rate, a, key):
     returns the tag, updates S
     """
     assert(len(key) in [16,20])
-    S[rate//8+0] ^= bytes_to_int(key[0:8])
-    S[rate//8+1] ^= bytes_to_int(key[8:16])
-    S[rate//8+2] ^= bytes_to_int(key[16:] + zero_bytes(24-len(key)))
+    K = bytes_to_words(key + zero_bytes(24-len(key)))
+    S[rate//8+0] ^= K[0]
+    S[rate//8+1] ^= K[1]
+    S[rate//8+2] ^= K[2]
 
     ascon_permutation(S, a)
 
-    S[3] ^= bytes_to_int(key[-16:-8])
-    S[4] ^= bytes_to_int(key[-8:])
-    tag = int_to_bytes(S[3], 8) + int_to_bytes(S[4], 8)
+    K = bytes_to_words(key[-16:])
+    S[3] ^= K[0]
+    S[4] ^= K[1]
+    tag = words_to_bytes(S[3:5])
     if debug: printstate(S, "finalization:")
     return tag
 
 
 # === Ascon permutation ===
 
+ROUND_CONSTANTS = {rounds: tuple(0xf0 - r*0x10 + r*0x1 for r in range(12-rounds, 12)) for rounds in range(0, 13)}
+
 def ascon_permutation(S, rounds=1):
     """
     Ascon core permutation for the sponge construction - internal helper function.
@@ -365,6 +1019,33 @@ def ascon_permutation(S, rounds=1):
     rounds: number of rounds to perform
     returns nothing, updates S
     """
+    if debugpermutation: return ascon_permutation_instrumented(S, rounds)
+    x0, x1, x2, x3, x4 = S
+    for c in ROUND_CONSTANTS[rounds]:
+        # --- add round constants ---
+        x2 ^= c
+        # --- substitution layer ---
+        x0 ^= x4; x4 ^= x3; x2 ^= x1
+        t0 = ~x0 & x1; t1 = ~x1 & x2; t2 = ~x2 & x3; t3 = ~x3 & x4; t4 = ~x4 & x0
+        x0 ^= t1; x1 ^= t2; x2 ^= t3; x3 ^= t4; x4 ^= t0
+        x1 ^= x0; x0 ^= x4; x3 ^= x2; x2 ^= 0xFFFFFFFFFFFFFFFF
+        # --- linear diffusion layer (rotations inlined, truncated to 64 bits once) ---
+        x0 = (x0 ^ (x0 >> 19) ^ (x0 << 45) ^ (x0 >> 28) ^ (x0 << 36)) & 0xFFFFFFFFFFFFFFFF
+        x1 = (x1 ^ (x1 >> 61) ^ (x1 <<  3) ^ (x1 >> 39) ^ (x1 << 25)) & 0xFFFFFFFFFFFFFFFF
+        x2 = (x2 ^ (x2 >>  1) ^ (x2 << 63) ^ (x2 >>  6) ^ (x2 << 58)) & 0xFFFFFFFFFFFFFFFF
+        x3 = (x3 ^ (x3 >> 10) ^ (x3 << 54) ^ (x3 >> 17) ^ (x3 << 47)) & 0xFFFFFFFFFFFFFFFF
+        x4 = (x4 ^ (x4 >>  7) ^ (x4 << 57) ^ (x4 >> 41) ^ (x4 << 23)) & 0xFFFFFFFFFFFFFFFF
+    S[0], S[1], S[2], S[3], S[4] = x0, x1, x2, x3, x4
+
+
+def ascon_permutation_instrumented(S, rounds=1):
+    """
+    Reference Ascon permutation, round by round with debug output - internal helper function.
+    Used instead of ascon_permutation when debugpermutation is set; both give identical results.
+    S: Ascon state, a list of 5 64-bit integers
+    rounds: number of rounds to perform
+    returns nothing, updates S
+    """
     assert(rounds <= 12)
     if debugpermutation: printwords(S, "permutation input:")
     for r in range(12-rounds, 12):
@@ -395,7 +1076,6 @@ def ascon_permutation(S, rounds=1):
 # === helper functions ===
 
 def get_random_bytes(num):
-    import os
     return to_bytes(os.urandom(num))
 
 def zero_bytes(n):
@@ -404,14 +1084,22 @@ def zero_bytes(n):
 def to_bytes(l): # where l is a list or bytearray or bytes
     return bytes(bytearray(l))
 
-def bytes_to_int(bytes):
-    return sum([bi << ((len(bytes) - 1 - i)*8) for i, bi in enumerate(to_bytes(bytes))])
-
 def bytes_to_state(bytes):
-    return [bytes_to_int(bytes[8*w:8*(w+1)]) for w in range(5)]
+    return list(bytes_to_words(bytes[:40]))
 
 def int_to_bytes(integer, nbytes):
-    return to_bytes([(integer >> ((nbytes - 1 - i) * 8)) % 256 for i in range(nbytes)])
+    return (integer & ((1 << (8 * nbytes)) - 1)).to_bytes(nbytes, "big")
+
+def bytes_to_words(data): # where len(data) is a multiple of 8; returns an array of 64-bit big-endian words
+    words = array("Q")
+    words.frombytes(data)
+    if sys.byteorder == "little": words.byteswap()
+    return words
+
+def words_to_bytes(words): # where words is an array or list of 64-bit integers; returns their big-endian bytes
+    words = array("Q", words)
+    if sys.byteorder == "little": words.byteswap()
+    return words.tobytes()
 
 def rotr(val, r):
     return (val >> r) | ((val & (1<<r)-1) << (64-r))
@@ -429,6 +1117,93 @@ def printwords(S, description=""):
     print("\n".join(["  x{i}={s:016x}".format(**locals()) for i, s in enumerate(S)]))
 
 
+# === Ascon backends ===
+
+BACKEND_VARIABLE = "ASCON_BACKEND" # environment variable naming the backend to select at import
+BACKEND_PREFERENCE = ["c", "optimized", "reference", "numpy"] # the first available one is the default
+BACKENDS = {} # name -> {"encrypt", "decrypt", "hash", "mac", "permutation": function}
+BACKEND = {} # the functions of the selected backend
+OPTIMIZED_PERMUTATION = ascon_permutation
+backend = None # the name of the selected backend
+
+def register_backend(name, encrypt=None, decrypt=None, hash=None, mac=None, permutation=None):
+    """
+    Makes a backend available to set_backend.
+    name: the name of the backend
+    encrypt, decrypt, hash, mac: functions with the signatures of ascon_encrypt, ascon_decrypt, ascon_hash, ascon_mac
+        (missing ones fall back to the pure-Python implementation)
+    permutation: the permutation used by the pure-Python code while the backend is selected (default: the optimized one)
+    returns nothing
+    """
+    BACKENDS[name] = {"encrypt": encrypt or ascon_encrypt_python,
+                      "decrypt": decrypt or ascon_decrypt_python,
+                      "hash": hash or ascon_hash_python,
+                      "mac": mac or ascon_mac_python,
+                      "permutation": permutation or OPTIMIZED_PERMUTATION}
+
+def available_backends():
+    """
+    returns the names of the registered backends, the preferred ones first
+    """
+    return sorted(BACKENDS, key=lambda name: BACKEND_PREFERENCE.index(name) if name in BACKEND_PREFERENCE else len(BACKEND_PREFERENCE))
+
+def get_backend():
+    """
+    returns the name of the selected backend
+    """
+    return backend
+
+def set_backend(name=None):
+    """
+    Selects the backend of ascon_encrypt, ascon_decrypt, ascon_hash and ascon_mac.
+    The other functions and classes of this module always run in pure Python (with the permutation of the backend).
+    name: one of available_backends(); None or a backend that is not available selects the preferred one
+    returns the name of the selected backend
+    """
+    global backend, ascon_permutation
+    if name not in BACKENDS: name = available_backends()[0]
+    backend = name
+    BACKEND.update(BACKENDS[name])
+    ascon_permutation = BACKEND["permutation"]
+    # the cached initial states were computed with the previous permutation
+    HASH_INITIAL_STATES.clear()
+    ascon_mac_initial_state.cache_clear()
+    return name
+
+def ascon_encrypt_numpy(key, nonce, associateddata, plaintext, variant="Ascon-128"):
+    """
+    Ascon encryption on the NumPy batch engine (a batch of one) - internal helper function.
+    """
+    from ascon_numpy import ascon_encrypt_batch
+    return ascon_encrypt_batch([key], [nonce], [associateddata], [plaintext], variant)[0]
+
+def ascon_decrypt_numpy(key, nonce, associateddata, ciphertext, variant="Ascon-128"):
+    """
+    Ascon decryption on the NumPy batch engine (a batch of one) - internal helper function.
+    """
+    from ascon_numpy import ascon_decrypt_batch
+    return ascon_decrypt_batch([key], [nonce], [associateddata], [ciphertext], variant)[0]
+
+def ascon_mac_numpy(key, message, variant="Ascon-Mac", taglength=16):
+    """
+    Ascon MAC and PRF on the NumPy batch engine (a batch of one) - internal helper function.
+    """
+    from ascon_numpy import ascon_mac_batch
+    return ascon_mac_batch([key], [message], variant, taglength)[0]
+
+register_backend("optimized")
+register_backend("reference", permutation=ascon_permutation_instrumented)
+if importlib.util.find_spec("numpy") is not None:
+    # a batch of one is ~20x slower than "optimized" (array overhead per call), so this backend is ranked last and only
+    # useful for cross-checking; the NumPy engine pays off through the *_batch functions of ascon_numpy
+    register_backend("numpy", encrypt=ascon_encrypt_numpy, decrypt=ascon_decrypt_numpy, mac=ascon_mac_numpy)
+if importlib.util.find_spec("ascon_c") is not None:
+    # optional C extension providing ascon_encrypt, ascon_decrypt, ascon_hash and/or ascon_mac
+    import ascon_c
+    register_backend("c", *[getattr(ascon_c, function, None) for function in ["ascon_encrypt", "ascon_decrypt", "ascon_hash", "ascon_mac"]])
+set_backend(os.environ.get(BACKEND_VARIABLE))
+
+
 # === some demo if called directly ===
 
 def demo_print(data):
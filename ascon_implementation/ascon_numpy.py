@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+"""
+Vectorized Ascon v1.2 engine that processes many independent messages at once.
+The states of N messages are kept as a NumPy uint64 array of shape (5, N) (one lane per message),
+so every permutation round runs over all lanes with a handful of array operations.
+Messages of different lengths are handled by masking lanes whose data is exhausted.
+"""
+
+import hmac
+
+import numpy as np
+
+from ascon import ROUND_CONSTANTS, to_bytes, zero_bytes
+
+MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+# === Ascon AEAD encryption and decryption ===
+
+def ascon_encrypt_batch(keys, nonces, associateddatas, plaintexts, variant="Ascon-128"):
+    """
+    Ascon encryption of N independent messages.
+    keys: a list of N keys (bytes objects of size 16 for Ascon-128, Ascon-128a or 20 for Ascon-80pq)
+    nonces: a list of N nonces (bytes objects of size 16, must not repeat for the same key!)
+    associateddatas: a list of N bytes objects of arbitrary length
+    plaintexts: a list of N bytes objects of arbitrary length
+    variant: "Ascon-128", "Ascon-128a", or "Ascon-80pq" (the same for the whole batch)
+    returns a list of N bytes objects, each equal to ascon_encrypt(key, nonce, associateddata, plaintext, variant)
+    """
+    assert len(keys) == len(nonces) == len(associateddatas) == len(plaintexts)
+    a, b, rate = aead_parameters(keys, nonces, variant)
+
+    S = ascon_initialize_batch(keys, nonces, rate, a, b)
+    ascon_process_associated_data_batch(S, b, rate, associateddatas)
+
+    # plaintext processing: S ^= P (padded), C = S
+    P, t = lane_blocks(plaintexts, rate, padding=True)
+    C = np.empty_like(P)
+    for j in range(P.shape[0]):
+        S[:rate//8] ^= P[j]
+        C[j] = S[:rate//8]
+        ascon_permutation_batch_where(S, b, j < t - 1)
+
+    tags = ascon_finalize_batch(S, rate, a, keys)
+    ciphertexts = lanes_to_bytes(C)
+    return [ciphertexts[i][:len(plaintexts[i])] + tags[i] for i in range(len(plaintexts))]
+
+
+def ascon_decrypt_batch(keys, nonces, associateddatas, ciphertexts, variant="Ascon-128"):
+    """
+    Ascon decryption of N independent messages.
+    keys, nonces, associateddatas, variant: as for ascon_encrypt_batch
+    ciphertexts: a list of N bytes objects of arbitrary length (each also contains its 16-byte tag)
+    returns a list of N entries, each the plaintext or None if verification of that message fails
+    """
+    assert len(keys) == len(nonces) == len(associateddatas) == len(ciphertexts)
+    assert all(len(c) >= 16 for c in ciphertexts)
+    a, b, rate = aead_parameters(keys, nonces, variant)
+
+    S = ascon_initialize_batch(keys, nonces, rate, a, b)
+    ascon_process_associated_data_batch(S, b, rate, associateddatas)
+
+    # ciphertext processing: P = (C ^ S) & M, S ^= P ^ padding
+    bodies = [c[:-16] for c in ciphertexts]
+    C, t = lane_blocks(bodies, rate, padding=False)
+    M, _ = lane_blocks([b"\xff" * len(c) for c in bodies], rate, padding=False)
+    D, _ = lane_blocks([zero_bytes(len(c)) for c in bodies], rate, padding=True)
+    P = np.empty_like(C)
+    for j in range(C.shape[0]):
+        P[j] = (C[j] ^ S[:rate//8]) & M[j]
+        S[:rate//8] ^= P[j] ^ D[j]
+        ascon_permutation_batch_where(S, b, j < t - 1)
+
+    tags = ascon_finalize_batch(S, rate, a, keys)
+    plaintexts = lanes_to_bytes(P)
+    return [plaintexts[i][:len(bodies[i])] if hmac.compare_digest(tags[i], bytes(ciphertexts[i][-16:])) else None
+            for i in range(len(ciphertexts))]
+
+
+# === Ascon MAC/PRF ===
+
+def ascon_mac_batch(keys, messages, variant="Ascon-Mac", taglength=16):
+    """
+    Ascon message authentication code (MAC) and pseudorandom function (PRF) of N independent messages.
+    keys: a list of N keys (bytes objects of size 16)
+    messages: a list of N bytes objects of arbitrary length (<= 16 for "Ascon-PrfShort")
+    variant: "Ascon-Mac", "Ascon-Maca", "Ascon-Prf", "Ascon-Prfa", or "Ascon-PrfShort" (the same for the whole batch)
+    taglength: the requested output bytelength (the same for the whole batch, restrictions as for ascon_mac)
+    returns a list of N bytes objects, each equal to ascon_mac(key, message, variant, taglength)
+    """
+    assert variant in ["Ascon-Mac", "Ascon-Prf", "Ascon-Maca", "Ascon-Prfa", "Ascon-PrfShort"]
+    assert len(keys) == len(messages)
+    assert all(len(key) == 16 for key in keys)
+    if variant in ["Ascon-Mac", "Ascon-Maca", "Ascon-PrfShort"]: assert(taglength <= 16)
+    if variant == "Ascon-PrfShort": assert(all(len(message) <= 16 for message in messages))
+    a = 12  # rounds
+    b = 8 if variant in ["Ascon-Prfa", "Ascon-Maca"] else 12  # rounds
+    msgblocksize = 40 if variant in ["Ascon-Prfa", "Ascon-Maca"] else 32 # bytes (input rate for Mac, Prf)
+    rate = 16 # bytes (output rate)
+
+    if variant == "Ascon-PrfShort":
+        # Initialization + Message Processing (Absorbing)
+        S = bytes_to_lanes([to_bytes([128, len(message)*8, a + 64, taglength * 8]) + zero_bytes(4) + key + message + zero_bytes(16 - len(message))
+                            for key, message in zip(keys, messages)], 5)
+        ascon_permutation_batch(S, a)
+
+        # Finalization (Squeezing)
+        K = bytes_to_lanes(keys, 2)
+        T = np.stack([S[3] ^ K[0], S[4] ^ K[1]])
+        return [tag[:taglength] for tag in lanes_to_bytes(T[np.newaxis])]
+
+    # Initialization
+    tagspec = 16*8 if variant in ["Ascon-Mac", "Ascon-Maca"] else 0
+    iv = to_bytes([128, rate * 8, a + 128, a-b]) + tagspec.to_bytes(4, "big")
+    S = bytes_to_lanes([iv + key + zero_bytes(16) for key in keys], 5)
+    ascon_permutation_batch(S, a)
+
+    # Message Processing (Absorbing)
+    words = msgblocksize // 8
+    M, t = lane_blocks(messages, msgblocksize, padding=True)
+    for j in range(M.shape[0]):
+        S[:words] ^= M[j]
+        ascon_permutation_batch_where(S, b, j < t - 1)
+    S[4] ^= np.uint64(1)
+
+    # Finalization (Squeezing)
+    ascon_permutation_batch(S, a)
+    blocks = []
+    while len(blocks) * rate < taglength:
+        blocks.append(S[:2].copy())
+        ascon_permutation_batch(S, b)
+    if not blocks: return [b""] * len(keys) # taglength 0 squeezes nothing
+    return [tag[:taglength] for tag in lanes_to_bytes(np.stack(blocks))]
+
+
+# === Ascon AEAD building blocks ===
+
+def aead_parameters(keys, nonces, variant):
+    """
+    Validate a batch of AEAD inputs - internal helper function.
+    returns the number of initialization rounds a, intermediate rounds b and the rate in bytes
+    """
+    assert variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+    keysize = 20 if variant == "Ascon-80pq" else 16
+    assert all(len(key) == keysize for key in keys)
+    assert all(len(nonce) == 16 for nonce in nonces)
+    a = 12   # rounds
+    b = 8 if variant == "Ascon-128a" else 6   # rounds
+    rate = 16 if variant == "Ascon-128a" else 8   # bytes
+    return a, b, rate
+
+
+def ascon_initialize_batch(keys, nonces, rate, a, b):
+    """
+    Ascon initialization phase for all lanes - internal helper function.
+    returns the state, a uint64 array of shape (5, N)
+    """
+    k = len(keys[0]) * 8 if keys else 128 # bits
+    iv = to_bytes([k, rate * 8, a, b] + (20-k//8)*[0])
+    S = bytes_to_lanes([iv + key + nonce for key, nonce in zip(keys, nonces)], 5)
+    ascon_permutation_batch(S, a)
+    S ^= bytes_to_lanes([zero_bytes(40-len(key)) + key for key in keys], 5)
+    return S
+
+
+def ascon_process_associated_data_batch(S, b, rate, associateddatas):
+    """
+    Ascon associated data processing phase for all lanes - internal helper function.
+    Lanes with empty associated data absorb nothing (their padding block is masked out).
+    returns nothing, updates S
+    """
+    A, s = lane_blocks(associateddatas, rate, padding=True)
+    empty = np.array([len(ad) == 0 for ad in associateddatas], dtype=bool)
+    A[:, :, empty] = 0
+    s[empty] = 0
+    for j in range(A.shape[0]):
+        S[:rate//8] ^= A[j]
+        ascon_permutation_batch_where(S, b, j < s)
+    S[4] ^= np.uint64(1)
+
+
+def ascon_finalize_batch(S, rate, a, keys):
+    """
+    Ascon finalization phase for all lanes - internal helper function.
+    returns a list of N 16-byte tags, updates S
+    """
+    K = bytes_to_lanes([key + zero_bytes(24-len(key)) for key in keys], 3)
+    S[rate//8:rate//8+3] ^= K
+    ascon_permutation_batch(S, a)
+    S[3:5] ^= bytes_to_lanes([key[-16:] for key in keys], 2)
+    return lanes_to_bytes(S[np.newaxis, 3:5])
+
+
+# === Ascon permutation ===
+
+def ascon_permutation_batch(S, rounds=1):
+    """
+    Ascon core permutation applied to every lane - internal helper function.
+    S: Ascon states, a uint64 array of shape (5, N)
+    rounds: number of rounds to perform
+    returns nothing, updates S
+    """
+    x0, x1, x2, x3, x4 = S
+    for c in ROUND_CONSTANTS[rounds]:
+        # --- add round constants ---
+        x2 ^= np.uint64(c)
+        # --- substitution layer ---
+        x0 ^= x4; x4 ^= x3; x2 ^= x1
+        t0 = ~x0 & x1; t1 = ~x1 & x2; t2 = ~x2 & x3; t3 = ~x3 & x4; t4 = ~x4 & x0
+        x0 ^= t1; x1 ^= t2; x2 ^= t3; x3 ^= t4; x4 ^= t0
+        x1 ^= x0; x0 ^= x4; x3 ^= x2; x2 ^= MASK64
+        # --- linear diffusion layer ---
+        x0 ^= rotr(x0, 19) ^ rotr(x0, 28)
+        x1 ^= rotr(x1, 61) ^ rotr(x1, 39)
+        x2 ^= rotr(x2,  1) ^ rotr(x2,  6)
+        x3 ^= rotr(x3, 10) ^ rotr(x3, 17)
+        x4 ^= rotr(x4,  7) ^ rotr(x4, 41)
+
+
+def ascon_permutation_batch_where(S, rounds, active):
+    """
+    Ascon core permutation applied to the lanes selected by a mask - internal helper function.
+    S: Ascon states, a uint64 array of shape (5, N)
+    rounds: number of rounds to perform
+    active: a boolean array of shape (N,), lanes set to False are left unchanged
+    returns nothing, updates S
+    """
+    if active.all():
+        ascon_permutation_batch(S, rounds)
+    elif active.any():
+        T = S[:, active]
+        ascon_permutation_batch(T, rounds)
+        S[:, active] = T
+
+
+# === helper functions ===
+
+def rotr(val, r):
+    return (val >> np.uint64(r)) | (val << np.uint64(64-r))
+
+def bytes_to_lanes(messages, words):
+    """
+    Convert N bytes objects of size 8*words into a uint64 array of shape (words, N) (big endian words).
+    """
+    data = np.frombuffer(b"".join(messages), dtype=">u8").reshape(len(messages), words)
+    return np.ascontiguousarray(data.astype(np.uint64).T)
+
+def lanes_to_bytes(blocks):
+    """
+    Convert a uint64 array of shape (blocks, words, N) into N bytes objects of size 8*words*blocks.
+    """
+    data = np.ascontiguousarray(blocks.transpose(2, 0, 1)).astype(">u8").tobytes()
+    size = len(data) // blocks.shape[2] if blocks.shape[2] else 0
+    return [data[i*size:(i+1)*size] for i in range(blocks.shape[2])]
+
+def lane_blocks(messages, blocksize, padding):
+    """
+    Split N messages into blocks of blocksize bytes, all lanes extended to the longest message.
+    padding: append the 0x80 padding byte (True) or only zero bytes (False)
+    returns the blocks as a uint64 array of shape (blocks, blocksize//8, N) and an int array of shape (N,)
+    with the number of blocks of every message (len(m)//blocksize + 1, the last one possibly empty)
+    """
+    n = len(messages)
+    t = np.array([len(m) // blocksize + 1 for m in messages], dtype=np.int64)
+    blocks = int(t.max()) if n else 1
+    width = blocks * blocksize
+    buffer = bytearray(n * width)
+    for i, m in enumerate(messages):
+        buffer[i*width:i*width+len(m)] = m
+        if padding: buffer[i*width+len(m)] = 0x80
+    data = np.frombuffer(bytes(buffer), dtype=">u8").reshape(n, blocks, blocksize // 8)
+    return np.ascontiguousarray(data.astype(np.uint64).transpose(1, 2, 0)), t
+
+
+# === some demo if called directly ===
+
+if __name__ == "__main__":
+    from ascon import ascon_encrypt, get_random_bytes
+
+    keys = [get_random_bytes(16) for _ in range(4)]
+    nonces = [get_random_bytes(16) for _ in range(4)]
+    plaintexts = [b"", b"ascon", b"ascon" * 5, b"ascon" * 9]
+    ciphertexts = ascon_encrypt_batch(keys, nonces, [b"ASCON"] * 4, plaintexts)
+    for key, nonce, plaintext, ciphertext in zip(keys, nonces, plaintexts, ciphertexts):
+        assert ciphertext == ascon_encrypt(key, nonce, b"ASCON", plaintext)
+    print("batch encryption matches ascon_encrypt for {n} messages".format(n=len(plaintexts)))
@@ -0,0 +1,379 @@
+from ascon import (
+    AsconMac,
+    ascon_decrypt,
+    ascon_decrypt_verified,
+    ascon_encrypt,
+    ascon_hash,
+    ascon_mac,
+    ascon_mac_initial_state,
+    ascon_permutation,
+    get_random_bytes
+)
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+
+AEAD_VARIANTS = ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+HASH_VARIANTS = ["Ascon-Hash", "Ascon-Hasha", "Ascon-Xof", "Ascon-Xofa"]
+MAC_VARIANTS = ["Ascon-Mac", "Ascon-Maca", "Ascon-Prf", "Ascon-Prfa", "Ascon-PrfShort"]
+SUITE_SIZES = [0, 1, 16, 64, 2**10, 2**14, 2**16, 2**20, 2**24] # bytes, 0 measures the per-call overhead
+THRESHOLD = 0.10 # a measurement more than 10% slower than the baseline is a regression
+
+
+def time_call(function, *args, repeat:int=3) -> float:
+    """Measures the best wall-clock time of a function call.
+
+    Args:
+        function (callable): the function to measure
+        *args: the arguments to pass to the function
+        repeat (int): how many times the call is repeated (the fastest run is kept)
+
+    Returns:
+        float: the fastest run time in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def cpu_frequency() -> float:
+    """Reads the current CPU clock frequency (Linux only).
+
+    Returns:
+        float: the frequency in Hz, or None if it cannot be read
+    """
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('cpu MHz'):
+                    return float(line.split(':')[1]) * 1e6
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def suite_operations(size:int) -> dict:
+    """Builds one call for every Ascon variant on a random message of the given size.
+
+    Args:
+        size (int): the size (in bytes) of the message
+
+    Returns:
+        dict: maps each operation name to a (function, args) tuple
+    """
+    message = get_random_bytes(size)
+    operations = {}
+    for variant in AEAD_VARIANTS:
+        key = get_random_bytes(20) if variant == "Ascon-80pq" else get_random_bytes(16)
+        nonce = get_random_bytes(16)
+        ciphertext = ascon_encrypt(key, nonce, b'', message, variant)
+        operations[f'{variant} encrypt'] = (ascon_encrypt, (key, nonce, b'', message, variant))
+        operations[f'{variant} decrypt'] = (ascon_decrypt, (key, nonce, b'', ciphertext, variant))
+    for variant in HASH_VARIANTS:
+        operations[variant] = (ascon_hash, (message, variant, 32))
+    for variant in MAC_VARIANTS:
+        # Ascon-PrfShort only accepts messages of up to 16 bytes
+        if variant != "Ascon-PrfShort" or size <= 16:
+            operations[variant] = (ascon_mac, (get_random_bytes(16), message, variant, 16))
+    return operations
+
+
+def benchmark_suite(sizes:list=SUITE_SIZES, repeat:int=3, frequency:float=None) -> dict:
+    """Measures every Ascon variant over a range of message sizes.
+
+    Args:
+        sizes (list): the message sizes (in bytes) to measure
+        repeat (int): how many times each call is repeated (the fastest run is kept, inputs of 1 MB or more run once)
+        frequency (float): the CPU frequency in Hz used for cycles/byte (None leaves cycles/byte out)
+
+    Returns:
+        dict: the machine description and, for each operation and size, the seconds, MB/s, cycles/byte
+            and the per-call overhead (the time of the empty message)
+    """
+    results = {}
+    for size in sizes:
+        for name, (function, args) in suite_operations(size).items():
+            # small inputs are too fast for a single call to be measured reliably
+            calls = max(1, 2**12 // max(size, 1))
+            seconds = time_call(lambda: [function(*args) for _ in range(calls)], repeat=repeat if size < 2**20 else 1) / calls
+            results.setdefault(name, {})[str(size)] = {
+                'seconds': seconds,
+                'mb_per_s': size / 1e6 / seconds if size else None,
+                'cycles_per_byte': seconds * frequency / size if size and frequency else None,
+            }
+    for name, measurements in results.items():
+        if '0' in measurements:
+            measurements['overhead_us'] = measurements['0']['seconds'] * 1e6
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'frequency_hz': frequency,
+        'results': results,
+    }
+
+
+def find_regressions(current:dict, baseline:dict, threshold:float=THRESHOLD) -> list:
+    """Compares a suite run against a stored baseline.
+
+    Args:
+        current (dict): the output of benchmark_suite
+        baseline (dict): a previous output of benchmark_suite
+        threshold (float): the allowed relative slowdown
+
+    Returns:
+        list: an (operation, size, baseline seconds, current seconds) tuple for every measurement slower than allowed
+    """
+    regressions = []
+    for name, measurements in current['results'].items():
+        for size, measurement in measurements.items():
+            if size == 'overhead_us':
+                continue
+            reference = baseline['results'].get(name, {}).get(size)
+            if reference is not None and measurement['seconds'] > reference['seconds'] * (1 + threshold):
+                regressions.append((name, int(size), reference['seconds'], measurement['seconds']))
+    return regressions
+
+
+def benchmark_encryption_scaling(variant:str, sizes:list, repeat:int=3) -> list:
+    """Measures how the encryption time grows with the input size.
+
+    Args:
+        variant (str): the variant of ascon ["Ascon-128", "Ascon-128a", "Ascon-80pq"] to benchmark
+        sizes (list): the plaintext sizes (in bytes) to encrypt
+        repeat (int): how many times each encryption is repeated (the fastest run is kept)
+
+    Returns:
+        list: a (size, seconds, microseconds per byte) tuple for each size
+    """
+    key = get_random_bytes(20) if variant == "Ascon-80pq" else get_random_bytes(16)
+    nonce = get_random_bytes(16)
+    associated_data = b'Associated data'
+
+    results = []
+    for size in sizes:
+        plaintext = get_random_bytes(size)
+        seconds = time_call(ascon_encrypt, key, nonce, associated_data, plaintext, variant, repeat=repeat)
+        results.append((size, seconds, seconds * 1e6 / size))
+    return results
+
+
+def benchmark_block_overhead(size:int=2**15) -> dict:
+    """Measures the per-block cost of every variant outside the permutation itself.
+
+    Args:
+        size (int): the size (in bytes) of the message processed by every variant
+
+    Returns:
+        dict: maps each variant and operation to the microseconds per block spent outside ascon_permutation
+    """
+    message = get_random_bytes(size)
+    blocks = 1000
+    state = [0, 0, 0, 0, 0]
+    permutation = {rounds: time_call(lambda: [ascon_permutation(state, rounds) for _ in range(blocks)]) * 1e6 / blocks
+                   for rounds in [6, 8, 12]}
+
+    results = {}
+    for variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]:
+        key = get_random_bytes(20) if variant == "Ascon-80pq" else get_random_bytes(16)
+        nonce = get_random_bytes(16)
+        rate, rounds = (16, 8) if variant == "Ascon-128a" else (8, 6)
+        ciphertext = ascon_encrypt(key, nonce, b'', message, variant)
+        count = size // rate
+        results[f'{variant} encrypt'] = time_call(ascon_encrypt, key, nonce, b'', message, variant) * 1e6 / count - permutation[rounds]
+        results[f'{variant} decrypt'] = time_call(ascon_decrypt, key, nonce, b'', ciphertext, variant) * 1e6 / count - permutation[rounds]
+    for variant in ["Ascon-Mac", "Ascon-Maca"]:
+        key = get_random_bytes(16)
+        msgblocksize, rounds = (40, 8) if variant == "Ascon-Maca" else (32, 12)
+        results[variant] = time_call(ascon_mac, key, message, variant) * 1e6 / (size // msgblocksize) - permutation[rounds]
+    return results
+
+
+def benchmark_forged_rejection(count:int=1000, size:int=1024, variant:str="Ascon-128") -> dict:
+    """Measures how fast forged packets (random tags) and packets of the wrong length are rejected.
+
+    Args:
+        count (int): the number of forged packets
+        size (int): the plaintext size (in bytes) of every packet
+        variant (str): the variant of ascon ["Ascon-128", "Ascon-128a", "Ascon-80pq"] to use
+
+    Returns:
+        dict: the packets per second rejected by ascon_decrypt and ascon_decrypt_verified
+    """
+    key = get_random_bytes(20) if variant == "Ascon-80pq" else get_random_bytes(16)
+    nonce = get_random_bytes(16)
+    forged = [ascon_encrypt(key, nonce, b'', get_random_bytes(size), variant)[:-16] + get_random_bytes(16) for _ in range(count)]
+    truncated = [packet[:-1] for packet in forged]
+
+    def reject(function, packets, *args):
+        for packet in packets:
+            assert function(key, nonce, b'', packet, variant, *args) is None
+
+    return {
+        'ascon_decrypt': count / time_call(reject, ascon_decrypt, forged, repeat=1),
+        'ascon_decrypt_verified': count / time_call(reject, ascon_decrypt_verified, forged, repeat=1),
+        'ascon_decrypt_verified (wrong length)': count / time_call(reject, ascon_decrypt_verified, truncated, size),
+    }
+
+
+def benchmark_batch(count:int=10000, size:int=64, variant:str="Ascon-128", mac_variant:str="Ascon-Mac") -> dict:
+    """Compares the throughput of the NumPy batch engine against the scalar functions.
+
+    Args:
+        count (int): the number of independent messages
+        size (int): the size (in bytes) of every message
+        variant (str): the variant of ascon ["Ascon-128", "Ascon-128a", "Ascon-80pq"] to use for encryption
+        mac_variant (str): the variant of ascon ["Ascon-Mac", "Ascon-Maca", "Ascon-Prf", "Ascon-Prfa"] to use for the MAC
+
+    Returns:
+        dict: the messages per second of the scalar and batch paths for encryption and MAC
+    """
+    # NumPy is only needed for this benchmark
+    from ascon_numpy import ascon_encrypt_batch, ascon_mac_batch
+
+    keysize = 20 if variant == "Ascon-80pq" else 16
+    keys = [get_random_bytes(keysize) for _ in range(count)]
+    mac_keys = [get_random_bytes(16) for _ in range(count)]
+    nonces = [get_random_bytes(16) for _ in range(count)]
+    associated_data = [b'Associated data'] * count
+    messages = [get_random_bytes(size) for _ in range(count)]
+
+    def scalar_encryption():
+        for key, nonce, ad, message in zip(keys, nonces, associated_data, messages):
+            ascon_encrypt(key, nonce, ad, message, variant)
+
+    def scalar_mac():
+        for key, message in zip(mac_keys, messages):
+            ascon_mac(key, message, mac_variant)
+
+    return {
+        'encrypt_scalar': count / time_call(scalar_encryption, repeat=1),
+        'encrypt_batch': count / time_call(ascon_encrypt_batch, keys, nonces, associated_data, messages, variant),
+        'mac_scalar': count / time_call(scalar_mac, repeat=1),
+        'mac_batch': count / time_call(ascon_mac_batch, mac_keys, messages, mac_variant),
+    }
+
+
+def benchmark_mac_context(count:int=2000, size:int=64, variant:str="Ascon-Mac") -> dict:
+    """Measures the per-request cost of MACing with the same key through ascon_mac and AsconMac.
+
+    Args:
+        count (int): the number of requests
+        size (int): the size (in bytes) of every request
+        variant (str): the variant of ascon ["Ascon-Mac", "Ascon-Maca", "Ascon-Prf", "Ascon-Prfa"] to use
+
+    Returns:
+        dict: the microseconds per request of ascon_mac without and with the key state cache and of AsconMac
+    """
+    key = get_random_bytes(16)
+    messages = [get_random_bytes(size) for _ in range(count)]
+    context = AsconMac(key, variant)
+
+    def uncached():
+        for message in messages:
+            ascon_mac_initial_state.cache_clear()
+            ascon_mac(key, message, variant)
+
+    def cached():
+        for message in messages:
+            ascon_mac(key, message, variant)
+
+    def keyed_context():
+        for message in messages:
+            context.mac(message)
+
+    return {name: time_call(function) * 1e6 / count
+            for name, function in [('ascon_mac', uncached), ('ascon_mac (cached key state)', cached), ('AsconMac', keyed_context)]}
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmarks every Ascon variant and compares the results against a baseline.')
+    parser.add_argument('--max-size', type=int, default=SUITE_SIZES[-1], help='largest message size (in bytes) of the suite')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (the fastest is kept)')
+    parser.add_argument('--cpu-ghz', type=float, default=None, help='CPU frequency used for cycles/byte (read from /proc/cpuinfo by default)')
+    parser.add_argument('--json', help='write the suite results to this file')
+    parser.add_argument('--baseline', help='fail if the suite is slower than the results stored in this file')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='allowed relative slowdown against the baseline')
+    parser.add_argument('--details', action='store_true', help='also run the scaling, per-block, keyed MAC and batch reports')
+    args = parser.parse_args()
+
+    #########
+    # SUITE #
+    #########
+    frequency = args.cpu_ghz * 1e9 if args.cpu_ghz else cpu_frequency()
+    suite = benchmark_suite([size for size in SUITE_SIZES if size <= args.max_size], args.repeat, frequency)
+
+    for name, measurements in suite['results'].items():
+        print(f'=== {name} (overhead {measurements.get("overhead_us", 0):.1f} us/call) ===')
+        for size, measurement in measurements.items():
+            if size in ['0', 'overhead_us']:
+                continue
+            cycles = measurement['cycles_per_byte']
+            print(f'{int(size):>10} bytes: {measurement["mb_per_s"]:8.3f} MB/s' + (f', {cycles:10.0f} cycles/byte' if cycles else ''))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(suite, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(suite, json.load(f), args.threshold)
+        for name, size, before, after in regressions:
+            print(f'REGRESSION {name} ({size} bytes): {before * 1e6:.1f} us -> {after * 1e6:.1f} us ({after / before - 1:+.0%})')
+        if regressions:
+            sys.exit(1)
+
+    if not args.details:
+        sys.exit(0)
+
+    ##################
+    # LINEAR SCALING #
+    ##################
+    # the time per byte must stay (roughly) constant when the input grows
+    SIZES = [2**12, 2**14, 2**16, 2**18]
+
+    for variant in ["Ascon-128", "Ascon-128a", "Ascon-80pq"]:
+        print(f'=== encryption scaling using {variant} ===')
+        for size, seconds, us_per_byte in benchmark_encryption_scaling(variant, SIZES):
+            print(f'{size:>10} bytes: {seconds:8.3f} s ({us_per_byte:.3f} us/byte)')
+
+    ##############################
+    # PER-BLOCK OVERHEAD BY MODE #
+    ##############################
+    print('=== per-block cost outside the permutation ===')
+    for name, us in benchmark_block_overhead().items():
+        print(f'{name:>20}: {us:6.2f} us/block')
+
+    #########################
+    # KEYED MAC PER REQUEST #
+    #########################
+    print('=== MAC of 64-byte requests with the same key ===')
+    for name, us in benchmark_mac_context().items():
+        print(f'{name:>30}: {us:8.1f} us/request')
+
+    ###########################
+    # FORGED PACKET REJECTION #
+    ###########################
+    print('=== rejection of forged 1 KiB packets ===')
+    for name, rate in benchmark_forged_rejection().items():
+        print(f'{name:>40}: {rate:10.0f} packets/s')
+
+    #########################
+    # BATCH VS SCALAR (10k) #
+    #########################
+    try:
+        results = benchmark_batch()
+    except ImportError:
+        print('NumPy is not installed, skipping the batch benchmark')
+    else:
+        print('=== 10000 messages of 64 bytes ===')
+        for operation in ['encrypt', 'mac']:
+            scalar, batch = results[f'{operation}_scalar'], results[f'{operation}_batch']
+            print(f'{operation:>8}: scalar {scalar:10.0f} msg/s, batch {batch:10.0f} msg/s ({batch / scalar:.1f}x)')
@@ -0,0 +1,488 @@
+"""
+Binary container for files encrypted with Ascon.
+
+Layout (all integers big endian):
+    magic          4 bytes   b'ASCN'
+    version        1 byte
+    variant        1 byte    see VARIANTS
+    flags          2 bytes   reserved, 0
+    nonce         16 bytes
+    ad length      4 bytes
+    segment size   4 bytes   plaintext bytes per segment
+    length         8 bytes   plaintext (and ciphertext) length
+    associated data          ad length bytes
+    tags                     16 bytes per segment
+    ciphertext               length bytes, segment i starts at i * segment size
+
+The ciphertext is stored raw (without tags), so segment i of the plaintext maps to the same
+position of the ciphertext and the container can be read and written one segment at a time.
+
+Every segment is encrypted with its own nonce (the file nonce with the segment index XORed into
+its last 8 bytes) and authenticates the whole header plus its index as associated data. Swapping
+segments, dropping segments (which needs a smaller length in the header) or editing the header
+therefore makes verification fail, and any byte range can be decrypted by authenticating only the
+segments it overlaps (see decrypt_range).
+
+Nonces never repeat under one key as long as every file of a run gets file_nonce(prefix, counter)
+with a distinct counter and a fresh random prefix per run: the file nonce is
+prefix (8 bytes) | file counter (4 bytes) | 0 (4 bytes), and segment_nonce XORs the segment index
+(< 2**32) into the zero bytes. The counters are handed out before any work is dispatched, so
+worker processes derive all their nonces without sharing any state.
+"""
+
+from ascon import (
+    ascon_decrypt,
+    ascon_decrypt_into,
+    ascon_encrypt_into,
+    get_random_bytes
+)
+
+from collections import namedtuple
+from contextlib import contextmanager
+import base64
+import mmap
+import os
+import struct
+
+
+MAGIC = b'ASCN'
+VERSION = 2
+VARIANTS = {'Ascon-128': 1, 'Ascon-128a': 2, 'Ascon-80pq': 3}
+HEADER_FORMAT = '>4sBBH16sIIQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+TAG_SIZE = 16
+NONCE_PREFIX_SIZE = 8 # random bytes shared by the files of a run
+FILE_COUNTER_SIZE = 4 # bytes, at most 2**32 files per run
+SEGMENT_COUNTER_SIZE = 4 # bytes, at most 2**32 segments per file
+SEGMENT_SIZE_LIMIT = 1 << 32 # bytes, segment sizes are stored in a 4-byte header field
+BASE64_CHUNK_SIZE = 3 << 16 # bytes, a multiple of 3 so the encoded chunks can be concatenated
+
+Header = namedtuple('Header', ['variant', 'nonce', 'associated_data', 'segment_size', 'length'])
+
+
+def segment_count(header:Header) -> int:
+    """Gets the number of segments of a container (an empty file has one empty segment).
+
+    Args:
+        header (Header): the header of the container
+
+    Returns:
+        int: the number of segments
+    """
+    return max(1, -(-header.length // header.segment_size))
+
+
+def tags_offset(header:Header) -> int:
+    """Gets the position of the tag table in the container.
+
+    Args:
+        header (Header): the header of the container
+
+    Returns:
+        int: the position of the first tag
+    """
+    return HEADER_SIZE + len(header.associated_data)
+
+
+def data_offset(header:Header) -> int:
+    """Gets the position of the ciphertext in the container.
+
+    Args:
+        header (Header): the header of the container
+
+    Returns:
+        int: the position of the first ciphertext byte
+    """
+    return tags_offset(header) + TAG_SIZE * segment_count(header)
+
+
+def segment_bounds(header:Header, index:int) -> tuple:
+    """Gets the position and size of a segment in the plaintext.
+
+    Args:
+        header (Header): the header of the container
+        index (int): the position of the segment in the file
+
+    Returns:
+        tuple: the offset and the length of the segment
+    """
+    offset = index * header.segment_size
+    return offset, min(header.segment_size, header.length - offset)
+
+
+def segment_nonce(nonce:bytes, index:int) -> bytes:
+    """Derives the nonce of a file segment (segment 0 uses the nonce itself).
+
+    Args:
+        nonce (bytes): the nonce of the file
+        index (int): the position of the segment in the file
+
+    Returns:
+        bytes: the nonce to use for the segment
+    """
+    return nonce[:8] + (int.from_bytes(nonce[8:], 'big') ^ index).to_bytes(8, 'big')
+
+
+def nonce_prefix() -> bytes:
+    """Draws the random nonce prefix of a run (see file_nonce).
+
+    Returns:
+        bytes: the prefix
+    """
+    return get_random_bytes(NONCE_PREFIX_SIZE)
+
+
+def file_nonce(prefix:bytes, counter:int) -> bytes:
+    """Derives the nonce of a file from the prefix of the run and the position of the file in the run.
+
+    Args:
+        prefix (bytes): the random prefix of the run
+        counter (int): the position of the file in the run (unique per file)
+
+    Raises:
+        ValueError: if the counter does not fit in the nonce
+
+    Returns:
+        bytes: the nonce of the file, its last SEGMENT_COUNTER_SIZE bytes are zero
+    """
+    if not 0 <= counter < 1 << (8 * FILE_COUNTER_SIZE):
+        raise ValueError('too many files for one nonce prefix')
+    return prefix + counter.to_bytes(FILE_COUNTER_SIZE, 'big') + bytes(SEGMENT_COUNTER_SIZE)
+
+
+def segment_associated_data(header:Header, index:int) -> bytes:
+    """Builds the associated data of a file segment (the serialized header and the segment index).
+
+    Args:
+        header (Header): the header of the container
+        index (int): the position of the segment in the file
+
+    Returns:
+        bytes: the associated data to use for the segment
+    """
+    return pack_header(header) + index.to_bytes(8, 'big')
+
+
+def pack_header(header:Header) -> bytes:
+    """Serializes the header of a container (including the associated data).
+
+    Args:
+        header (Header): the header to serialize
+
+    Returns:
+        bytes: the serialized header
+    """
+    return struct.pack(HEADER_FORMAT, MAGIC, VERSION, VARIANTS[header.variant], 0, header.nonce,
+                       len(header.associated_data), header.segment_size, header.length) + header.associated_data
+
+
+def read_header(f) -> Header:
+    """Reads the header of a container from an open file.
+
+    Args:
+        f (file): the container, opened in binary mode and positioned at its start
+
+    Raises:
+        ValueError: if the file is not a supported container
+
+    Returns:
+        Header: the header of the container
+    """
+    fields = f.read(HEADER_SIZE)
+    if len(fields) != HEADER_SIZE:
+        raise ValueError('truncated container header')
+    magic, version, variant, _, nonce, ad_length, segment_size, length = struct.unpack(HEADER_FORMAT, fields)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('not an Ascon container (or unsupported version)')
+    variants = {value: name for name, value in VARIANTS.items()}
+    if variant not in variants or segment_size == 0:
+        raise ValueError('corrupted container header')
+    associated_data = f.read(ad_length)
+    if len(associated_data) != ad_length:
+        raise ValueError('truncated container header')
+    return Header(variants[variant], nonce, associated_data, segment_size, length)
+
+
+def create_container(path:str, header:Header) -> None:
+    """Creates a container with its header and room for the tags and ciphertext.
+
+    Args:
+        path (str): the path of the container
+        header (Header): the header of the container
+
+    Raises:
+        ValueError: if the segment size does not fit the header or the file has more segments than distinct segment nonces
+
+    Returns:
+        None
+    """
+    if not 1 <= header.segment_size < SEGMENT_SIZE_LIMIT:
+        raise ValueError(f'the segment size must be between 1 and {SEGMENT_SIZE_LIMIT - 1} bytes')
+    if segment_count(header) > 1 << (8 * SEGMENT_COUNTER_SIZE):
+        raise ValueError('too many segments, use a larger segment size')
+    with open(path, 'wb') as f:
+        f.write(pack_header(header))
+        f.truncate(data_offset(header) + header.length)
+
+
+@contextmanager
+def map_window(f, offset:int, length:int, access:int):
+    """Memory-maps a window of an open file, so only that window is paged in.
+
+    Args:
+        f (file): the file, opened in binary mode ('rb' for reading, 'r+b' for writing)
+        offset (int): the position of the window
+        length (int): the size of the window
+        access (int): mmap.ACCESS_READ or mmap.ACCESS_WRITE
+
+    Yields:
+        memoryview: a view of the window (only valid inside the with block)
+    """
+    if length == 0:
+        yield memoryview(bytearray())
+        return
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+    with mmap.mmap(f.fileno(), offset - start + length, access=access, offset=start) as m:
+        view = memoryview(m)[offset - start:]
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+def encrypt_segment(source:str, destination:str, header:Header, key:bytes, index:int) -> None:
+    """Encrypts one segment of a file into an existing container.
+    Both files are memory-mapped, so the ciphertext is written straight into the container.
+
+    Args:
+        source (str): the path of the plaintext file
+        destination (str): the path of the container (see create_container)
+        header (Header): the header of the container
+        key (bytes): the key to use for encryption
+        index (int): the position of the segment in the file
+
+    Returns:
+        None
+    """
+    offset, length = segment_bounds(header, index)
+    nonce = segment_nonce(header.nonce, index)
+    associated_data = segment_associated_data(header, index)
+    with open(source, 'rb') as src, open(destination, 'r+b') as dst:
+        with map_window(src, offset, length, mmap.ACCESS_READ) as plaintext, \
+             map_window(dst, data_offset(header) + offset, length, mmap.ACCESS_WRITE) as ciphertext:
+            tag = ascon_encrypt_into(key, nonce, associated_data, plaintext, ciphertext, header.variant)
+        dst.seek(tags_offset(header) + TAG_SIZE * index)
+        dst.write(tag)
+
+
+def decrypt_segment(source:str, destination:str, header:Header, key:bytes, index:int) -> None:
+    """Decrypts one segment of a container into an existing file.
+    Both files are memory-mapped, so the plaintext is written straight into the output file.
+
+    Args:
+        source (str): the path of the container
+        destination (str): the path of the plaintext file (at least as long as the segment end)
+        header (Header): the header of the container
+        key (bytes): the key to use for decryption
+        index (int): the position of the segment in the file
+
+    Raises:
+        ValueError: if the segment fails verification
+
+    Returns:
+        None
+    """
+    offset, length = segment_bounds(header, index)
+    nonce = segment_nonce(header.nonce, index)
+    associated_data = segment_associated_data(header, index)
+    with open(source, 'rb') as src, open(destination, 'r+b') as dst:
+        src.seek(tags_offset(header) + TAG_SIZE * index)
+        tag = src.read(TAG_SIZE)
+        with map_window(src, data_offset(header) + offset, length, mmap.ACCESS_READ) as ciphertext, \
+             map_window(dst, offset, length, mmap.ACCESS_WRITE) as plaintext:
+            verified = ascon_decrypt_into(key, nonce, associated_data, ciphertext, tag, plaintext, header.variant)
+    if not verified:
+        raise ValueError(f'segment {index} failed verification')
+
+
+def read_segment(f, header:Header, key:bytes, index:int) -> bytes:
+    """Reads, authenticates and decrypts one segment of an open container.
+
+    Args:
+        f (file): the container, opened in binary mode
+        header (Header): the header of the container
+        key (bytes): the key to use for decryption
+        index (int): the position of the segment in the file
+
+    Raises:
+        ValueError: if the segment fails verification
+
+    Returns:
+        bytes: the plaintext of the segment
+    """
+    offset, length = segment_bounds(header, index)
+    f.seek(tags_offset(header) + TAG_SIZE * index)
+    tag = f.read(TAG_SIZE)
+    f.seek(data_offset(header) + offset)
+    ciphertext = f.read(length)
+    plaintext = ascon_decrypt(key, segment_nonce(header.nonce, index), segment_associated_data(header, index), ciphertext + tag, header.variant)
+    if plaintext is None:
+        raise ValueError(f'segment {index} failed verification')
+    return plaintext
+
+
+def decrypt_range(path:str, offset:int, length:int, key:bytes) -> bytes:
+    """Decrypts a byte range of a container, authenticating only the segments it overlaps.
+
+    Args:
+        path (str): the path of the container
+        offset (int): the position of the first plaintext byte to return
+        length (int): the number of bytes to return (fewer if the range passes the end of the file)
+        key (bytes): the key to use for decryption
+
+    Raises:
+        ValueError: if the container is malformed or an overlapping segment fails verification
+
+    Returns:
+        bytes: the plaintext of the range
+    """
+    header = open_container(path)
+    start = min(max(offset, 0), header.length)
+    end = min(start + max(length, 0), header.length)
+    if start == end:
+        return b''
+    first = start // header.segment_size
+    last = (end - 1) // header.segment_size
+    with open(path, 'rb') as f:
+        plaintext = b''.join(read_segment(f, header, key, index) for index in range(first, last + 1))
+    skip = start - first * header.segment_size
+    return plaintext[skip:skip + end - start]
+
+
+def encrypt_file(source:str, destination:str, key:bytes, nonce:bytes, associated_data:bytes, variant:str, segment_size:int) -> Header:
+    """Encrypts a file into a container, one segment at a time.
+
+    Args:
+        source (str): the path of the plaintext file
+        destination (str): the path of the container
+        key (bytes): the key to use for encryption
+        nonce (bytes): the nonce of the file (see file_nonce)
+        associated_data (bytes): the associated data (stored in the container)
+        variant (str): the variant of ascon ["Ascon-128", "Ascon-128a", "Ascon-80pq"] to use for encryption
+        segment_size (int): the maximum size of a segment
+
+    Returns:
+        Header: the header of the container
+    """
+    header = Header(variant, nonce, associated_data, segment_size, os.path.getsize(source))
+    create_container(destination, header)
+    for index in range(segment_count(header)):
+        encrypt_segment(source, destination, header, key, index)
+    return header
+
+
+def decrypt_file(source:str, destination:str, key:bytes) -> Header:
+    """Decrypts a container into a file, one segment at a time.
+    The output file is removed if any segment fails verification.
+
+    Args:
+        source (str): the path of the container
+        destination (str): the path of the plaintext file
+        key (bytes): the key to use for decryption
+
+    Raises:
+        ValueError: if the container is malformed or a segment fails verification
+
+    Returns:
+        Header: the header of the container
+    """
+    header = open_container(source)
+    create_plaintext(destination, header)
+    try:
+        for index in range(segment_count(header)):
+            decrypt_segment(source, destination, header, key, index)
+    except Exception:
+        os.remove(destination)
+        raise
+    return header
+
+
+def open_container(path:str) -> Header:
+    """Reads and checks the header of a container.
+
+    Args:
+        path (str): the path of the container
+
+    Raises:
+        ValueError: if the file is not a supported container or has the wrong size
+
+    Returns:
+        Header: the header of the container
+    """
+    with open(path, 'rb') as f:
+        header = read_header(f)
+    if os.path.getsize(path) != data_offset(header) + header.length:
+        raise ValueError('container size does not match its header')
+    return header
+
+
+def read_tags(path:str) -> bytes:
+    """Reads the tag table of a container (it changes whenever any segment is re-encrypted).
+
+    Args:
+        path (str): the path of the container
+
+    Raises:
+        ValueError: if the file is not a supported container or has the wrong size
+
+    Returns:
+        bytes: the tags of all segments
+    """
+    header = open_container(path)
+    with open(path, 'rb') as f:
+        f.seek(tags_offset(header))
+        return f.read(TAG_SIZE * segment_count(header))
+
+
+def create_plaintext(path:str, header:Header) -> None:
+    """Creates the output file of a decryption with its final size.
+
+    Args:
+        path (str): the path of the plaintext file
+        header (Header): the header of the container
+
+    Returns:
+        None
+    """
+    with open(path, 'wb') as f:
+        f.truncate(header.length)
+
+
+def export_base64(source:str, destination:str) -> None:
+    """Writes a base64 encoded copy of a container (for text-only channels).
+
+    Args:
+        source (str): the path of the container
+        destination (str): the path of the base64 file
+
+    Returns:
+        None
+    """
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        while chunk := src.read(BASE64_CHUNK_SIZE):
+            dst.write(base64.b64encode(chunk))
+
+
+def import_base64(source:str, destination:str) -> None:
+    """Restores a container from its base64 encoded copy.
+
+    Args:
+        source (str): the path of the base64 file
+        destination (str): the path of the container
+
+    Returns:
+        None
+    """
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        while chunk := src.read(BASE64_CHUNK_SIZE // 3 * 4):
+            dst.write(base64.b64decode(chunk))
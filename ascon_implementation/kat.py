@@ -0,0 +1,523 @@
+"""
+Known-answer tests (KAT) for the Ascon engines of this directory.
+
+The reference vectors are generated with the pure-Python functions and the reference permutation
+of ascon.py (whatever backend is selected) and stored in the format of the NIST lightweight
+cryptography (LWC) KAT files, one file per variant:
+
+    Count = 1
+    Key = 000102030405060708090A0B0C0D0E0F
+    Nonce = 000102030405060708090A0B0C0D0E0F
+    PT =
+    AD =
+    CT = E355159F292911F794CB1432A0103A8A
+
+(hash files use Msg/MD and MAC files Key/Msg/Tag). The generated vectors are pinned: each file must
+match the SHA-256 digest in KAT_DIGESTS and the official LWC answers in OFFICIAL_VECTORS, so a bug
+shared by ascon.py and every backend (padding, word conversion, ...) fails generate and check
+instead of being written into the KAT files. Every registered backend is then run over the stored
+vectors in a process pool and its mismatches and speed are reported side by side.
+"""
+
+from ascon import (
+    AsconDecryptor,
+    AsconEncryptor,
+    AsconHash,
+    AsconMac,
+    ascon_decrypt_python,
+    ascon_encrypt_python,
+    ascon_hash_python,
+    ascon_mac_python
+)
+import ascon
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import argparse
+import hashlib
+import importlib.util
+import os
+import sys
+import time
+
+
+KAT_DIRECTORY = 'kat'
+AEAD_VARIANTS = ["Ascon-128", "Ascon-128a", "Ascon-80pq"]
+HASH_VARIANTS = ["Ascon-Hash", "Ascon-Hasha", "Ascon-Xof", "Ascon-Xofa"]
+MAC_VARIANTS = ["Ascon-Mac", "Ascon-Maca", "Ascon-Prf", "Ascon-Prfa", "Ascon-PrfShort"]
+AEAD_MAX_LENGTH = 32 # bytes, every plaintext/associated data length pair up to this is tested (as in the LWC KATs)
+MESSAGE_MAX_LENGTH = 1024 # bytes, every hash/MAC message length up to this is tested
+CHUNK = 128 # vectors per worker task
+STREAM_CHUNK = 7 # bytes fed per update() by the streaming backend, so chunks straddle block boundaries
+
+# SHA-256 of every KAT file (as formatted by format_kat), computed with the unmodified reference implementation
+# (pyascon v1.2, the baseline ascon.py of this repo); hashlib instead of Ascon-Hash, so ascon.py never vouches for itself.
+# Changing AEAD_MAX_LENGTH or MESSAGE_MAX_LENGTH changes the files, and so these digests.
+KAT_DIGESTS = {
+    "Ascon-128": '6d616b2ab817f391030ab3ba15dff37fad20433f7a7ac925aadcba550b12e3b0',
+    "Ascon-128a": 'd453a54fd663316a6223734013dcd2d732e2b1dee0c85391cf6f818000322fd9',
+    "Ascon-80pq": 'f09109d124b4939499f5010718e30e448ced6780a4f66b7cb8c2b544d51a208b',
+    "Ascon-Hash": 'd2bcd84caf152a643eb6e7615bd39b7f18a3d2465d5936d1b76aef7a173975ca',
+    "Ascon-Hasha": 'e6171afe21eb844f552ab95a62ad7659ba5ff7180741e861c7b17d80e8e37ea2',
+    "Ascon-Xof": '017fe60debee986b092ffd43bc5b6deb2075979ccf8d884998f542c0077245cd',
+    "Ascon-Xofa": 'eea976d7a7726feb22f16e71ba9b6139d7f9f929f5d8592dbaf866c90fe2435f',
+    "Ascon-Mac": '343b5c330b3152c49f06b869578bd3ac20a70d37cb557f11633aa9a4ce93d443',
+    "Ascon-Maca": 'f58b6195ad28131db2846489fc43e47041809d1e3e7b7932a894fb14703f0467',
+    "Ascon-Prf": '984624c97fd17631bbdcd3adb8177a432f551f6644d59a1f68b76aec96c2f444',
+    "Ascon-Prfa": 'e6a5532e631394095ed3c480970d893be36362abbff2432ae525265b96e2d9c2',
+    "Ascon-PrfShort": '5b5783679ddd1aca09c3697aa0eeb40624acf1fd55332064c7dde2c5abca5bc4',
+}
+
+# expected outputs (CT or MD) of the official NIST LWC KAT files, by Count
+OFFICIAL_VECTORS = {
+    "Ascon-128": {1: 'E355159F292911F794CB1432A0103A8A', 2: '944DF887CD4901614C5DEDBC42FC0DA0'},
+    "Ascon-128a": {1: '7A834E6F09210957067B10FD831F0078'},
+    "Ascon-80pq": {1: 'ABB688EFA0B9D56B33277A2C97D2146B'},
+    "Ascon-Hash": {1: '7346BC14F036E87AE03D0997913088F5F68411434B3CF8B54FA796A80D251F91',
+                   2: '8DD446ADA58A7740ECF56EB638EF775F7D5C0FD5F0C2BBBDFDEC29609D3C43A2'},
+    "Ascon-Hasha": {1: 'AECD027026D0675F9DE7A8AD8CCF512DB64B1EDCF0B20C388A0C7CC617AAA2C4'},
+    "Ascon-Xof": {1: '5D4CBDE6350EA4C174BD65B5B332F8408F99740B81AA02735EAEFBCF0BA0339E'},
+    "Ascon-Xofa": {1: '7C10DFFD6BB03BE262D72FBE1B0F530013C6C4EADAABDE278D6F29D579E3908D'},
+}
+
+# maps each backend name to {kind: function(variant, vectors) -> list of outputs (None if the variant is not supported)}
+BACKENDS = {}
+
+
+def register_backend(name:str, **kinds) -> None:
+    """Registers a backend to be checked against the KAT files.
+
+    Args:
+        name (str): the name of the backend
+        **kinds: the 'encrypt', 'decrypt', 'hash' and/or 'mac' functions of the backend, each taking
+            a variant and a list of vectors and returning the list of outputs (or None if the variant
+            is not supported)
+
+    Returns:
+        None
+    """
+    BACKENDS[name] = kinds
+
+
+def kat_filename(variant:str, directory:str=KAT_DIRECTORY) -> str:
+    """Gets the name of the KAT file of a variant.
+
+    Args:
+        variant (str): the variant of ascon
+        directory (str): the directory of the KAT files
+
+    Returns:
+        str: the path of the KAT file
+    """
+    kind = 'AEAD' if variant in AEAD_VARIANTS else 'HASH' if variant in HASH_VARIANTS else 'MAC'
+    return f'{directory}/LWC_{kind}_KAT_{variant}.txt'
+
+
+def sequence(length:int) -> bytes:
+    """Gets the LWC test input of a given length (00 01 02 ...).
+
+    Args:
+        length (int): the length in bytes
+
+    Returns:
+        bytes: the input
+    """
+    return bytes(i % 256 for i in range(length))
+
+
+def generate_vectors(variant:str) -> list:
+    """Computes the reference vectors of a variant with the pure-Python functions of ascon.py and the reference permutation.
+
+    Args:
+        variant (str): the variant of ascon
+
+    Returns:
+        list: one dict per vector mapping each field name to its value (bytes, or int for Count)
+    """
+    vectors = []
+    # pinned to the reference path, so the vectors never come from an engine under test
+    with pinned_backend('reference'):
+        if variant in AEAD_VARIANTS:
+            key = sequence(20 if variant == "Ascon-80pq" else 16)
+            nonce = sequence(16)
+            for pt_length in range(AEAD_MAX_LENGTH + 1):
+                for ad_length in range(AEAD_MAX_LENGTH + 1):
+                    plaintext, associated_data = sequence(pt_length), sequence(ad_length)
+                    ciphertext = ascon_encrypt_python(key, nonce, associated_data, plaintext, variant)
+                    vectors.append({'Key': key, 'Nonce': nonce, 'PT': plaintext, 'AD': associated_data, 'CT': ciphertext})
+        elif variant in HASH_VARIANTS:
+            for length in range(MESSAGE_MAX_LENGTH + 1):
+                message = sequence(length)
+                vectors.append({'Msg': message, 'MD': ascon_hash_python(message, variant, 32)})
+        else:
+            key = sequence(16)
+            for length in range(16 + 1 if variant == "Ascon-PrfShort" else MESSAGE_MAX_LENGTH + 1):
+                message = sequence(length)
+                vectors.append({'Key': key, 'Msg': message, 'Tag': ascon_mac_python(key, message, variant, 16)})
+    return [{'Count': count, **vector} for count, vector in enumerate(vectors, 1)]
+
+
+def format_kat(vectors:list) -> str:
+    """Formats vectors in the LWC KAT format.
+
+    Args:
+        vectors (list): the vectors, as returned by generate_vectors
+
+    Returns:
+        str: the contents of the KAT file
+    """
+    lines = []
+    for vector in vectors:
+        for field, value in vector.items():
+            lines.append(f'{field} = {value}' if field == 'Count' else f'{field} = {value.hex().upper()}')
+        lines.append('')
+    return ''.join(line + '\n' for line in lines)
+
+
+def write_kat(path:str, vectors:list) -> None:
+    """Writes vectors to a file in the LWC KAT format.
+
+    Args:
+        path (str): the path of the KAT file
+        vectors (list): the vectors, as returned by generate_vectors
+
+    Returns:
+        None
+    """
+    with open(path, 'w', newline='\n') as f:
+        f.write(format_kat(vectors))
+
+
+def kat_digest(vectors:list) -> str:
+    """Gets the SHA-256 digest of the KAT file of some vectors (independent of how the file was stored).
+
+    Args:
+        vectors (list): the vectors
+
+    Returns:
+        str: the hex digest
+    """
+    return hashlib.sha256(format_kat(vectors).encode()).hexdigest()
+
+
+def verify_vectors(variant:str, vectors:list) -> list:
+    """Compares the vectors of a variant with the pinned digest and the official LWC answers.
+
+    Args:
+        variant (str): the variant of ascon
+        vectors (list): the vectors, generated or read from a KAT file
+
+    Returns:
+        list: the error messages (empty if the vectors are the known answers)
+    """
+    errors = []
+    field = kat_checks(variant)[0][1]
+    outputs = {vector['Count']: vector.get(field, b'').hex().upper() for vector in vectors}
+    for count, expected in OFFICIAL_VECTORS.get(variant, {}).items():
+        if outputs.get(count) != expected:
+            errors.append(f'{variant}: Count {count} differs from the official LWC KAT')
+    if kat_digest(vectors) != KAT_DIGESTS[variant]:
+        errors.append(f'{variant}: the vectors do not match the pinned digest')
+    return errors
+
+
+def read_kat(path:str) -> list:
+    """Reads the vectors of a file in the LWC KAT format.
+
+    Args:
+        path (str): the path of the KAT file
+
+    Returns:
+        list: one dict per vector mapping each field name to its value (bytes, or int for Count)
+    """
+    vectors = []
+    vector = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                if vector:
+                    vectors.append(vector)
+                vector = {}
+                continue
+            field, _, value = line.partition('=')
+            field, value = field.strip(), value.strip()
+            vector[field] = int(value) if field == 'Count' else bytes.fromhex(value)
+    if vector:
+        vectors.append(vector)
+    return vectors
+
+
+def generate_kats(directory:str=KAT_DIRECTORY) -> list:
+    """Generates and stores the KAT files of every variant (files that fail verify_vectors are not written).
+
+    Args:
+        directory (str): the directory of the KAT files
+
+    Returns:
+        list: the error messages of verify_vectors (empty if every file was written)
+    """
+    os.makedirs(directory, exist_ok=True)
+    errors = []
+    for variant in AEAD_VARIANTS + HASH_VARIANTS + MAC_VARIANTS:
+        vectors = generate_vectors(variant)
+        variant_errors = verify_vectors(variant, vectors)
+        if not variant_errors:
+            write_kat(kat_filename(variant, directory), vectors)
+        errors += variant_errors
+    return errors
+
+
+def verify_kats(directory:str=KAT_DIRECTORY) -> list:
+    """Checks that the stored KAT files hold the known answers.
+
+    Args:
+        directory (str): the directory of the KAT files
+
+    Returns:
+        list: the error messages of verify_vectors (empty if every file is intact)
+    """
+    errors = []
+    for variant in AEAD_VARIANTS + HASH_VARIANTS + MAC_VARIANTS:
+        errors += verify_vectors(variant, read_kat(kat_filename(variant, directory)))
+    return errors
+
+
+def kat_checks(variant:str) -> list:
+    """Gets the backend operations that apply to the KAT file of a variant.
+
+    Args:
+        variant (str): the variant of ascon
+
+    Returns:
+        list: a (kind, name of the expected field) tuple for every operation
+    """
+    if variant in AEAD_VARIANTS:
+        return [('encrypt', 'CT'), ('decrypt', 'PT')]
+    if variant in HASH_VARIANTS:
+        return [('hash', 'MD')]
+    return [('mac', 'Tag')]
+
+
+def run_backend(backend:str, kind:str, variant:str, vectors:list) -> tuple:
+    """Runs one operation of a backend over some vectors (runs in a worker process).
+
+    Args:
+        backend (str): the name of the backend
+        kind (str): the operation ['encrypt', 'decrypt', 'hash', 'mac']
+        variant (str): the variant of ascon
+        vectors (list): the vectors
+
+    Returns:
+        tuple: the outputs (None if the variant is not supported) and the time spent in seconds
+    """
+    start = time.perf_counter()
+    outputs = BACKENDS[backend][kind](variant, vectors)
+    return outputs, time.perf_counter() - start
+
+
+def check_backends(backends:list, directory:str=KAT_DIRECTORY, workers:int=os.cpu_count()) -> dict:
+    """Runs backends over the stored KAT files in parallel and compares their outputs with the expected ones.
+
+    Args:
+        backends (list): the names of the backends to check
+        directory (str): the directory of the KAT files
+        workers (int): the number of worker processes
+
+    Returns:
+        dict: maps each (backend, kind, variant) to its (vectors checked, Counts of the mismatching
+            vectors, seconds spent in the workers), or to None if the backend does not support it
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for variant in AEAD_VARIANTS + HASH_VARIANTS + MAC_VARIANTS:
+            vectors = read_kat(kat_filename(variant, directory))
+            for kind, field in kat_checks(variant):
+                for backend in backends:
+                    if kind not in BACKENDS[backend]:
+                        continue
+                    for chunk in range(0, len(vectors), CHUNK):
+                        part = vectors[chunk:chunk+CHUNK]
+                        futures.append(((backend, kind, variant), field, part,
+                                        executor.submit(run_backend, backend, kind, variant, part)))
+
+        for name, field, part, future in futures:
+            outputs, seconds = future.result()
+            if outputs is None:
+                results[name] = None
+                continue
+            checked, mismatches, total = results.get(name) or (0, [], 0.0)
+            mismatches += [vector['Count'] for vector, output in zip(part, outputs) if output != vector[field]]
+            results[name] = (checked + len(part), mismatches, total + seconds)
+    return results
+
+
+def print_results(results:dict) -> None:
+    """Prints the mismatches and speed of every backend side by side.
+
+    Args:
+        results (dict): as returned by check_backends
+
+    Returns:
+        None
+    """
+    backends = sorted({backend for backend, _, _ in results})
+    print(f'{"operation":<28}' + ''.join(f'{backend:>24}' for backend in backends))
+    for kind, variant in sorted({(kind, variant) for _, kind, variant in results}, key=lambda name: name[1]):
+        row = f'{variant + " " + kind:<28}'
+        for backend in backends:
+            result = results.get((backend, kind, variant))
+            if result is None:
+                row += f'{"-":>24}'
+                continue
+            checked, mismatches, seconds = result
+            status = 'ok' if not mismatches else f'{len(mismatches)} FAIL'
+            row += f'{status:>8} {checked / max(seconds, 1e-9):9.0f} vec/s'
+        print(row)
+    for (backend, kind, variant), result in sorted(results.items()):
+        if result is not None and result[1]:
+            print(f'{backend} {variant} {kind}: mismatching Count {", ".join(map(str, result[1][:10]))}')
+
+
+# === backends ===
+
+@contextmanager
+def pinned_backend(name:str):
+    """Selects a backend of ascon.py (and so the permutation of its pure-Python code) inside a with block.
+
+    Args:
+        name (str): the backend, 'reference' for the round-by-round permutation, 'optimized' for the unrolled one
+
+    Returns:
+        None
+    """
+    previous = ascon.get_backend()
+    ascon.set_backend(name)
+    try:
+        yield
+    finally:
+        ascon.set_backend(previous)
+
+
+def scalar_encrypt(variant:str, vectors:list) -> list:
+    return [ascon_encrypt_python(v['Key'], v['Nonce'], v['AD'], v['PT'], variant) for v in vectors]
+
+
+def scalar_decrypt(variant:str, vectors:list) -> list:
+    return [ascon_decrypt_python(v['Key'], v['Nonce'], v['AD'], v['CT'], variant) for v in vectors]
+
+
+def scalar_hash(variant:str, vectors:list) -> list:
+    return [ascon_hash_python(v['Msg'], variant, 32) for v in vectors]
+
+
+def scalar_mac(variant:str, vectors:list) -> list:
+    return [ascon_mac_python(v['Key'], v['Msg'], variant, 16) for v in vectors]
+
+
+def pinned(name:str, function):
+    """Wraps a scalar backend function so that it runs with the permutation of a backend of ascon.py
+    (not the one selected through ASCON_BACKEND).
+
+    Args:
+        name (str): the backend of ascon.py
+        function (callable): the backend function
+
+    Returns:
+        callable: the wrapped backend function
+    """
+    def run(variant, vectors):
+        with pinned_backend(name):
+            return function(variant, vectors)
+    return run
+
+
+def chunks(data:bytes) -> list:
+    return [data[i:i+STREAM_CHUNK] for i in range(0, len(data), STREAM_CHUNK)]
+
+
+def stream_encrypt(variant:str, vectors:list) -> list:
+    outputs = []
+    for v in vectors:
+        encryptor = AsconEncryptor(v['Key'], v['Nonce'], v['AD'], variant)
+        outputs.append(b''.join([encryptor.update(chunk) for chunk in chunks(v['PT'])] + [encryptor.finalize()]))
+    return outputs
+
+
+def stream_decrypt(variant:str, vectors:list) -> list:
+    outputs = []
+    for v in vectors:
+        decryptor = AsconDecryptor(v['Key'], v['Nonce'], v['AD'], variant)
+        plaintext = b''.join(decryptor.update(chunk) for chunk in chunks(v['CT']))
+        last = decryptor.finalize()
+        outputs.append(None if last is None else plaintext + last)
+    return outputs
+
+
+def stream_hash(variant:str, vectors:list) -> list:
+    outputs = []
+    for v in vectors:
+        hasher = AsconHash(variant)
+        for chunk in chunks(v['Msg']):
+            hasher.update(chunk)
+        outputs.append(hasher.digest(32))
+    return outputs
+
+
+def stream_mac(variant:str, vectors:list) -> list:
+    if variant == "Ascon-PrfShort":
+        return None
+    return [AsconMac(v['Key'], variant, 16).mac(v['Msg']) for v in vectors]
+
+
+def batch_encrypt(variant:str, vectors:list) -> list:
+    from ascon_numpy import ascon_encrypt_batch
+    return ascon_encrypt_batch([v['Key'] for v in vectors], [v['Nonce'] for v in vectors],
+                               [v['AD'] for v in vectors], [v['PT'] for v in vectors], variant)
+
+
+def batch_decrypt(variant:str, vectors:list) -> list:
+    from ascon_numpy import ascon_decrypt_batch
+    return ascon_decrypt_batch([v['Key'] for v in vectors], [v['Nonce'] for v in vectors],
+                               [v['AD'] for v in vectors], [v['CT'] for v in vectors], variant)
+
+
+def batch_mac(variant:str, vectors:list) -> list:
+    from ascon_numpy import ascon_mac_batch
+    return ascon_mac_batch([v['Key'] for v in vectors], [v['Msg'] for v in vectors], variant, 16)
+
+
+register_backend('reference', encrypt=pinned('reference', scalar_encrypt), decrypt=pinned('reference', scalar_decrypt),
+                 hash=pinned('reference', scalar_hash), mac=pinned('reference', scalar_mac))
+register_backend('unrolled', encrypt=pinned('optimized', scalar_encrypt), decrypt=pinned('optimized', scalar_decrypt),
+                 hash=pinned('optimized', scalar_hash), mac=pinned('optimized', scalar_mac))
+register_backend('streaming', encrypt=stream_encrypt, decrypt=stream_decrypt, hash=stream_hash, mac=stream_mac)
+if importlib.util.find_spec('numpy') is not None:
+    register_backend('numpy', encrypt=batch_encrypt, decrypt=batch_decrypt, mac=batch_mac)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Generates the Ascon KAT files and checks every backend against them.')
+    parser.add_argument('command', choices=['generate', 'check'], help='generate the KAT files or check the backends against them')
+    parser.add_argument('--directory', default=KAT_DIRECTORY, help='directory of the KAT files')
+    parser.add_argument('--backends', nargs='+', choices=sorted(BACKENDS), default=sorted(BACKENDS), help='backends to check')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes')
+    args = parser.parse_args()
+
+    if args.command == 'generate' or not os.path.exists(kat_filename(AEAD_VARIANTS[0], args.directory)):
+        errors = generate_kats(args.directory)
+        print('\n'.join(errors) or f'KAT files written to {args.directory}/')
+        if errors:
+            sys.exit(1)
+
+    if args.command == 'check':
+        errors = verify_kats(args.directory)
+        if errors:
+            print('\n'.join(errors))
+            sys.exit(1)
+        results = check_backends(args.backends, args.directory, args.workers)
+        print_results(results)
+        if any(result is not None and result[1] for result in results.values()):
+            sys.exit(1)
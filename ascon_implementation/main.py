@@ -1,112 +1,352 @@
-from ascon import (
-    ascon_encrypt, 
-    ascon_decrypt,
-    get_random_bytes
+from ascon import ascon_hash, get_random_bytes
+from container import (
+    SEGMENT_SIZE_LIMIT,
+    Header,
+    create_container,
+    create_plaintext,
+    decrypt_segment,
+    encrypt_segment,
+    export_base64,
+    file_nonce,
+    nonce_prefix,
+    open_container,
+    read_tags,
+    segment_count
 )
 
-import base64
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
 import os
+import time
 
 
+SEGMENT_SIZE = 1 << 20 # bytes, files larger than this are split into several segments
+MANIFEST = 'encrypted_data/manifest.json'
+CHECKPOINT_INTERVAL = 1.0 # seconds, the manifest is rewritten at most this often while a run progresses
 
-def read_file_data(filename:str, directory:str) -> bytes:
-    """Reads file data from a file in a directory.
+
+def encrypted_filename(filename:str) -> str:
+    """Gets the name of the container of a file.
+
+    Args:
+        filename (str): the name of the original file
+
+    Returns:
+        str: the name of the encrypted file (the whole filename is kept, so notes.txt and notes.md do not collide)
+    """
+    return filename + '.enc'
+
+
+def load_key(path:str, size:int) -> bytes:
+    """Reads the key of previous runs, or draws a new one and stores it.
+
+    Args:
+        path (str): the path of the key file (hex encoded), or None for a key that only lives for this run
+        size (int): the size of the key in bytes
+
+    Returns:
+        bytes: the key
+    """
+    if path is None:
+        return get_random_bytes(size)
+    if os.path.exists(path):
+        with open(path) as f:
+            return bytes.fromhex(f.read().strip())
+    key = get_random_bytes(size)
+    with open(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as f:
+        f.write(key.hex())
+    return key
+
+
+def key_id(key:bytes) -> str:
+    """Gets a fingerprint of a key, so a manifest is only trusted with the key it was written with.
 
     Args:
-        filename (str): the name of the file to read
-        directory (str): the directory to read the file from
+        key (bytes): the key
 
     Returns:
-        bytes: the data read from the file
+        str: the fingerprint
     """
-    with open(f'{directory}/{filename}', 'rb') as f:
-        data = f.read()
-    return data
+    return ascon_hash(b'manifest key id' + key)[:16].hex()
+
 
+def load_manifest(path:str, settings:dict) -> dict:
+    """Reads the manifest of previous runs.
 
-def write_file_data(filename:str, directory:str, data:bytes) -> None:
-    """Writes data to a file in a directory.
-    
     Args:
-        filename (str): the name of the file to write to
-        directory (str): the directory to write the file to
-        data (bytes): the data to write to the file
-        
+        path (str): the path of the manifest
+        settings (dict): the key fingerprint and the encryption parameters of this run
+
+    Returns:
+        dict: maps each filename to its entry (status, size, mtime, tag); empty if there is no manifest
+            or it was written with other settings
+    """
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('settings') != settings:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(path:str, settings:dict, files:dict) -> None:
+    """Writes the manifest atomically (a crash leaves either the old or the new manifest).
+
+    Args:
+        path (str): the path of the manifest
+        settings (dict): the key fingerprint and the encryption parameters of this run
+        files (dict): maps each filename to its entry
+
     Returns:
         None
     """
-    with open(f'{directory}/{filename}', 'wb') as f:
-        f.write(data)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as f:
+        json.dump({'settings': settings, 'files': files}, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
 
 
-def encryption(filename:str, key:bytes, nonce:bytes, associated_data:bytes, variant:str) -> None:
-    """Does the encryption process (encrypt data and store encrypted data in a file).
+def is_unchanged(entry:dict, filename:str) -> bool:
+    """Checks whether a file was encrypted completely and has not changed since.
 
     Args:
-        filename (str): the name of the file to encrypt
+        entry (dict): the manifest entry of the file (or None)
+        filename (str): the name of the file (in the files directory)
+
+    Returns:
+        bool: True if the file can be skipped
+    """
+    if entry is None or entry['status'] != 'done':
+        return False
+    stat = os.stat(f'files/{filename}')
+    if (entry['size'], entry['mtime']) != (stat.st_size, stat.st_mtime_ns):
+        return False
+    try:
+        return read_tags(f'encrypted_data/{encrypted_filename(filename)}').hex() == entry['tag']
+    except (OSError, ValueError):
+        return False
+
+
+def timed(function, *args) -> float:
+    """Calls a function and measures how long it takes (runs in a worker process).
+
+    Args:
+        function (callable): the function to call
+        *args: the arguments to pass to the function
+
+    Returns:
+        float: the time spent in the call in seconds
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def run_parallel(tasks:dict, workers:int, on_file_done=None) -> dict:
+    """Runs the segment tasks of several files in a process pool (in this process if workers is 1).
+
+    Args:
+        tasks (dict): maps each filename to a list of (function, args) tuples, one per segment
+        workers (int): the number of worker processes
+        on_file_done (callable): called with the filename, seconds and error (or None) once all segments of a file finished;
+            an exception it raises is reported as the error of that file
+
+    Returns:
+        dict: maps each filename to its (seconds spent in the workers, error message or None)
+    """
+    report = {filename: [0.0, None] for filename in tasks}
+    remaining = {filename: len(segments) for filename, segments in tasks.items()}
+
+    def finished(filename, result):
+        try:
+            report[filename][0] += result()
+        except Exception as e:
+            if report[filename][1] is None:
+                report[filename][1] = str(e)
+        remaining[filename] -= 1
+        if remaining[filename] == 0 and on_file_done is not None:
+            try:
+                on_file_done(filename, *report[filename])
+            except Exception as e:
+                # a failing callback only fails its own file, the rest of the batch carries on
+                if report[filename][1] is None:
+                    report[filename][1] = str(e)
+
+    if workers == 1:
+        for filename, segments in tasks.items():
+            for function, args in segments:
+                finished(filename, lambda: timed(function, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(timed, function, *args): filename
+                       for filename, segments in tasks.items()
+                       for function, args in segments}
+
+            for future in as_completed(futures):
+                finished(futures[future], future.result)
+
+    return {filename: tuple(value) for filename, value in report.items()}
+
+
+def encrypt_files(filenames:list, key:bytes, prefix:bytes, associated_data:bytes, variant:str, workers:int, segment_size:int=SEGMENT_SIZE, export:bool=False, manifest:str=MANIFEST) -> dict:
+    """Encrypts several files in parallel, splitting large files into segments.
+    Every file gets its own nonce (the run prefix and its position in filenames), assigned here
+    before any work is dispatched, so the workers never coordinate.
+    The job is resumable: files the manifest records as encrypted with the same key and parameters,
+    and whose size and modification time did not change, are skipped. The manifest is checkpointed
+    atomically while the run progresses, so an interrupted run only redoes the unfinished files.
+
+    Args:
+        filenames (list): the names of the files to encrypt (in the files directory)
         key (bytes): the key to use for encryption
-        nonce (bytes): the nonce to use for encryption
+        prefix (bytes): the random nonce prefix of the run (see container.nonce_prefix), never reused with the same key
         associated_data (bytes): the associated data to use for encryption
         variant (str): the variant of ascon ["Ascon-128", "Ascon-128a", "Ascon-80pq"] to use for encryption
+        workers (int): the number of worker processes
+        segment_size (int): the maximum size of a segment
+        export (bool): also write a base64 copy of every container (.b64)
+        manifest (str): the path of the manifest (None disables resuming)
 
     Returns:
-        None
+        dict: maps each filename to its (seconds spent in the workers or None if skipped, error message or None)
     """
-    try: 
-        directory = 'encrypted_data'
-        source_directory = 'files'
-        data = read_file_data(filename, source_directory)
-        filename = filename.split('.')[0] + '.enc'
-
-        ciphertext = ascon_encrypt(key, nonce, associated_data, data, variant)
-        ciphertext = base64.b64encode(ciphertext)
-        
-        write_file_data(filename, directory, ciphertext)
-    except Exception as e:
-        print(e)
-        # stop the program if an error occurs
-        exit()
-
-    
-def decryption(filename:str, encrypted_data:bytes, key:bytes, nonce:bytes, associated_data:bytes, variant:str) -> None:
-    """Does the decryption process (decrypt data and store decrypted data in a file).
+    settings = {'key': key_id(key), 'variant': variant, 'associated_data': associated_data.hex(),
+                'segment_size': segment_size, 'base64': export}
+    entries = load_manifest(manifest, settings) if manifest else {}
+    entries = {filename: entries[filename] for filename in filenames if filename in entries}
+    skipped = {filename: (None, None) for filename in filenames if is_unchanged(entries.get(filename), filename)}
+    checkpoint = [time.perf_counter()]
+
+    def save(force=False):
+        if manifest and (force or time.perf_counter() - checkpoint[0] >= CHECKPOINT_INTERVAL):
+            save_manifest(manifest, settings, entries)
+            checkpoint[0] = time.perf_counter()
+
+    def file_done(filename, seconds, error):
+        destination = f'encrypted_data/{encrypted_filename(filename)}'
+        # the entry is only restored, as done, once the container and its export are complete
+        entry = entries.pop(filename, None)
+        try:
+            if error is not None:
+                if os.path.exists(destination):
+                    os.remove(destination)
+            else:
+                if export:
+                    export_base64(destination, destination[:-len('.enc')] + '.b64')
+                entries[filename] = {**entry, 'status': 'done', 'tag': read_tags(destination).hex()}
+        finally:
+            save()
+
+    tasks = {}
+    failed = {}
+    for counter, filename in enumerate(filenames):
+        if filename in skipped:
+            continue
+        source = f'files/{filename}'
+        destination = f'encrypted_data/{encrypted_filename(filename)}'
+        try:
+            # size and mtime are taken before reading, so a file modified during the run is redone next time
+            stat = os.stat(source)
+            entries[filename] = {'status': 'encrypting', 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'tag': None}
+            header = Header(variant, file_nonce(prefix, counter), associated_data, segment_size, stat.st_size)
+            create_container(destination, header)
+        except Exception as e:
+            entries.pop(filename, None)
+            failed[filename] = (0.0, str(e))
+            continue
+        tasks[filename] = [(encrypt_segment, (source, destination, header, key, index))
+                           for index in range(segment_count(header))]
+
+    save(force=True)
+    report = run_parallel(tasks, workers, file_done)
+    save(force=True)
+    return {**report, **failed, **skipped}
+
+
+def decrypt_files(filenames:list, key:bytes, workers:int) -> dict:
+    """Decrypts several files in parallel, one task per segment.
+    The variant, nonce and associated data are read from the containers.
 
     Args:
-        filename (str): the name of the file to decrypt
-        encrypted_data (bytes): the encrypted data to decrypt
+        filenames (list): the names of the original files (their .enc files are read from encrypted_data)
         key (bytes): the key to use for decryption
-        nonce (bytes): the nonce to use for decryption
-        associated_data (bytes): the associated data to use for decryption
-        variant (str): the variant of ascon ["Ascon-128", "Ascon-128a", "Ascon-80pq"] to use for decryption
+        workers (int): the number of worker processes
 
     Returns:
-        None
+        dict: maps each filename to its (seconds spent in the workers, error message or None)
     """
-    try:
-        encrypted_data_directory = 'encrypted_data'
-        encrypted_data_filename = filename.split('.')[0] + '.enc'
-        directory = 'decrypted_data'
+    tasks = {}
+    failed = {}
+    for filename in filenames:
+        source = f'encrypted_data/{encrypted_filename(filename)}'
+        destination = f'decrypted_data/{filename}'
+        try:
+            header = open_container(source)
+            create_plaintext(destination, header)
+        except Exception as e:
+            failed[filename] = (0.0, str(e))
+            continue
+        tasks[filename] = [(decrypt_segment, (source, destination, header, key, index))
+                           for index in range(segment_count(header))]
 
-        encrypted_data = read_file_data(encrypted_data_filename, encrypted_data_directory)
-        encrypted_data = base64.b64decode(encrypted_data)
+    report = run_parallel(tasks, workers)
+    for filename, (_, error) in report.items():
+        if error is not None:
+            # never leave unauthenticated plaintext behind
+            os.remove(f'decrypted_data/{filename}')
+    return {**report, **failed}
 
-        decrypted_data = ascon_decrypt(key, nonce, associated_data, encrypted_data, variant)
 
-        write_file_data(filename, directory, decrypted_data)
-    except Exception as e:
-        print(e)
-        # stop the program if an error occurs
-        exit()
+def print_report(title:str, report:dict, elapsed:float) -> None:
+    """Prints the per-file and aggregate throughput of a run.
+
+    Args:
+        title (str): the name of the operation
+        report (dict): maps each filename to its (seconds spent in the workers or None if skipped, error message or None)
+        elapsed (float): the wall-clock time of the whole run in seconds
+
+    Returns:
+        None
+    """
+    print(f'=== {title} ===')
+    total = 0
+    for filename, (seconds, error) in sorted(report.items()):
+        if error is not None:
+            print(f'{filename}: FAILED ({error})')
+            continue
+        if seconds is None:
+            print(f'{filename}: unchanged, skipped')
+            continue
+        size = os.path.getsize(f'files/{filename}')
+        total += size
+        print(f'{filename}: {size / 1e6:.3f} MB in {seconds:.3f} s ({size / 1e6 / max(seconds, 1e-9):.3f} MB/s)')
+    print(f'total: {total / 1e6:.3f} MB in {elapsed:.3f} s ({total / 1e6 / max(elapsed, 1e-9):.3f} MB/s)')
+
 
- 
 if __name__ == '__main__':
 
+    parser = argparse.ArgumentParser(description='Encrypts and decrypts every file in the files directory with Ascon.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of worker processes (1 runs sequentially)')
+    parser.add_argument('--segment-size', type=int, default=SEGMENT_SIZE, help='files larger than this (in bytes) are split into segments')
+    parser.add_argument('--base64', action='store_true', help='also export every container as base64 text (.b64)')
+    parser.add_argument('--key-file', help='key to reuse across runs (created if missing); unchanged files are only skipped with the same key')
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    if not 1 <= args.segment_size < SEGMENT_SIZE_LIMIT:
+        parser.error(f'--segment-size must be between 1 and {SEGMENT_SIZE_LIMIT - 1}')
+
     ###################
     # ENCRYPTION DATA #
     ###################
     variant = 'Ascon-128a'
-    key = get_random_bytes(20) if variant == "Ascon-80pq" else get_random_bytes(16)
-    nonce = get_random_bytes(16)
+    key = load_key(args.key_file, 20 if variant == "Ascon-80pq" else 16)
+    prefix = nonce_prefix() # fresh per run, every file nonce is derived from it
     associated_data = b'Associated data'
 
 
@@ -114,20 +354,19 @@ if __name__ == '__main__':
     # ENCRYPTION #
     ##############
 
-    FILES = os.listdir('files')
+    # regular files only, the directory may hold others (e.g. __pycache__)
+    FILES = [f for f in os.listdir('files') if os.path.isfile(os.path.join('files', f))]
 
-    for filename in FILES:
-        encryption(filename, key, nonce, associated_data, variant)
+    start = time.perf_counter()
+    report = encrypt_files(FILES, key, prefix, associated_data, variant, args.workers, args.segment_size, args.base64)
+    print_report('encryption', report, time.perf_counter() - start)
 
     ##############
     # DECRYPTION #
     ##############
 
-    for filename in FILES:
-        encrypted_filename = filename.split('.')[0] + '.enc'
-        with open(f'encrypted_data/{encrypted_filename}', 'rb') as f:
-            encrypted_data = base64.b64decode(f.read())
-
-        decryption(filename, encrypted_data, key, nonce, associated_data, variant)
+    start = time.perf_counter()
+    report = decrypt_files(FILES, key, args.workers)
+    print_report('decryption', report, time.perf_counter() - start)
 
     print('Done!')